@@ -1,9 +1,10 @@
 import pygame
 import math
-from queue import PriorityQueue
 import json
-import os
-import random
+
+import mazefile
+from mazestore import MazeStore
+from solver import WALL, astar, index, position, wall_plane
 
 pygame.init()
 WIDTH = 800
@@ -35,7 +36,6 @@ class Spot:
         self.x = row * width
         self.y = col * width
         self.color = color
-        self.neighbors = []
         self.width = width
         self.total_rows = total_rows
 
@@ -87,29 +87,10 @@ class Spot:
     def draw(self, win):
         pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
 
-    def update_neighbors(self, grid):
-        self.neighbors = []
-        if self.row < self.total_rows - 1 and not grid[(self.row+1) * ROWS + self.col].is_barrier():  # DOWN
-            self.neighbors.append(grid[(self.row+1) * ROWS + self.col])
-
-        if self.row > 0 and not grid[(self.row -1)* ROWS+ self.col].is_barrier():  # UP
-            self.neighbors.append(grid[(self.row-1) * ROWS+ self.col])
-
-        if self.col < self.total_rows - 1 and not grid[self.row * ROWS +(1 + self.col)].is_barrier():  # RIGHT
-            self.neighbors.append(grid[self.row * ROWS +(1 + self.col)])
-
-        if self.col > 0 and not grid[self.row *ROWS+(self.col-1)].is_barrier():  # LEFT
-            self.neighbors.append(grid[self.row*ROWS+(self.col-1)])
-
     def __lt__(self, other):
         return False
 
 
-def h(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
-
 def display_popup_message(message):
     font = pygame.font.SysFont(None, POPUP_FONT_SIZE)
     text = font.render(message, True, POPUP_COLOR)
@@ -119,62 +100,46 @@ def display_popup_message(message):
     pygame.display.update()                           # Update the display
     pygame.time.delay(POPUP_DURATION)
 
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
-
-
 def algorithm(draw, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-    came_from = {}
-    g_score = {row: float("inf") for row in grid}
-    g_score[start] = 0
-    f_score = {row: float("inf") for row in grid}
-    f_score[start] = h(start.get_pos(), end.get_pos())
-    open_set_hash = {start}
-
-    while not open_set.empty():
+    rows = start.total_rows
+    plane = wall_plane(grid, rows, rows)
+    start_index = index(start.row, start.col, rows)
+
+    def visualize(current, opened):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
 
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    neighbor.make_open()
-
+        for i in opened:
+            grid[i].make_open()
         draw()
+        if current != start_index:
+            grid[current].make_closed()
 
-        if current != start:
-            current.make_closed()
-
-    return False
+    result = astar(plane, rows, rows, start_index, index(end.row, end.col, rows), visualize)
+    if not result.path:
+        return False
 
+    for i in reversed(result.path[:-1]):
+        grid[i].make_path()
+        draw()
+    end.make_end()
+    return True
 
 
-def make_grid(rows, width, maze_data):
+def make_grid(rows, width, maze):
     grid = []
     gap = width // rows
-    for row, col, color in maze_data:
+    for i, cell in enumerate(maze.plane):
+        if i == maze.start:
+            color = ORANGE
+        elif i == maze.end:
+            color = TURQUOISE
+        elif cell == WALL:
+            color = BLACK
+        else:
+            color = WHITE
+        row, col = position(i, maze.cols)
         spot = Spot(row, col, gap, rows, color)
         grid.append(spot)
 
@@ -221,28 +186,20 @@ def load_maze(file_name):
         return None
 
 
-def save_maze(grid, file_name, run_id = 1):
-    file_name = f'maze{run_id}.json'
-
-    maze = load_maze(file_name)
-    new_maze = []
-
-    for row in grid:
-        new_maze.append((row.row, row.col, row.color))
-
-    if maze:
-        maze.extend(new_maze)
-    else:
-        maze = new_maze
-
-    with open(file_name, 'w') as file:
-        json.dump(maze, file)
+def save_maze(grid, store):
+    maze = mazefile.from_spots(grid, ROWS, ROWS)
+    return store.save(maze)
 
 
 def main(win, width):
-    maze_id = random.randint(1, 3)  # Assuming you have 5 maze files
-    maze_data = load_maze(f"maze{maze_id}.json")
-    grid = make_grid(ROWS, width, maze_data)
+    store = MazeStore()
+    maze_id = store.random_id()
+    if maze_id is None:
+        # Nothing saved yet, start from an empty board.
+        maze = mazefile.Maze(ROWS, ROWS, None, None, bytearray(ROWS * ROWS))
+    else:
+        maze = store.load(maze_id)
+    grid = make_grid(ROWS, width, maze)
     display_popup_message("Player 1, it's your turn!") 
     player_turn = 1
     player1_path = []  # Define player1_path
@@ -288,7 +245,7 @@ def main(win, width):
                     player2_path = []
                     for row in grid:
                         row.reset() 
-                    grid = make_grid(ROWS, width, maze_data)
+                    grid = make_grid(ROWS, width, maze)
 
                 if game_over:
                     start = None
@@ -299,8 +256,6 @@ def main(win, width):
                         elif spot.is_end():
                             end = spot
                     if start and end:
-                        for row in grid:
-                                row.update_neighbors(grid)
                         algorithm(lambda: draw(win, grid, ROWS, width), grid, start, end)
 
 
@@ -0,0 +1,354 @@
+import pygame
+import math
+import json
+
+from animator import SearchAnimator
+from cellstate import CLOSED, END, OPEN, PALETTE, PATH, PLAYER1, PLAYER2, START, Grid, state_plane
+from mazegen import generate
+from mazestore import MazeStore
+from renderer import GridRenderer
+from scoring import PlayerPath, bitmap, judge, optimal_bitmap, overlap
+from solutioncache import SolutionCache
+from solveworker import SolveWorker
+from solver import FREE, WALL, distance_field
+from toasts import FPS, Toasts, wait_events
+
+WIDTH = 800
+POPUP_FONT_SIZE = 50
+POPUP_COLOR = (255, 255, 255)
+POPUP_BG_COLOR = (0, 0, 0)
+POPUP_DURATION = 2000
+MARGIN_TOP = 50
+ALGORITHM = "astar"  # any name in solver.SOLVERS
+WEIGHTED_ALGORITHM = "dial"  # for mazes with terrain, any name in solver.WEIGHTED
+GENERATOR = None  # None plays the saved mazes, or any name in mazegen.GENERATORS for a new maze each match
+FALLBACK_GENERATOR = "backtracker"  # used when there are no saved mazes to play
+MAZE_SIZE = (21, 21)
+SOLVE_TIMEOUT = 30  # seconds before the AI gives up on a maze
+POLL_MS = 50
+WIN = None
+RENDERER = GridRenderer(WIN)
+TOASTS = Toasts(WIN, RENDERER, (WIDTH // 2, MARGIN_TOP // 2), POPUP_FONT_SIZE, POPUP_COLOR, POPUP_BG_COLOR)
+
+WHITE = PALETTE[FREE]
+
+def open_window():
+    # pygame is only started here, so importing the game opens nothing.
+    global WIN
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, WIDTH))
+    pygame.display.set_caption("A* Path Finding Algorithm")
+    RENDERER.win = TOASTS.win = WIN
+    return WIN
+
+
+class Spot:
+    def __init__(self, grid, index):
+        self.plane = grid.plane
+        self.index = index
+        self.row, self.col = divmod(index, grid.cols)
+
+    def __eq__(self, other):
+        return isinstance(other, Spot) and self.index == other.index and self.plane is other.plane
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def color(self):
+        return PALETTE[self.plane[self.index]]
+
+    def set_state(self, state):
+        self.plane[self.index] = state
+        RENDERER.mark(self.index)
+
+    def get_pos(self):
+        return self.row, self.col
+
+    def is_closed(self):
+        return self.plane[self.index] == CLOSED
+
+    def is_open(self):
+        return self.plane[self.index] == OPEN
+
+    def is_barrier(self):
+        return self.plane[self.index] == WALL
+
+    def is_start(self):
+        return self.plane[self.index] == START
+
+    def is_end(self):
+        return self.plane[self.index] == END
+
+    def is_player1(self):
+        return self.plane[self.index] == PLAYER1
+
+    def is_player2(self):
+        return self.plane[self.index] == PLAYER2
+
+    def reset(self):
+        self.set_state(FREE)
+
+    def make_start(self):
+        self.set_state(START)
+
+    def make_closed(self):
+        self.set_state(CLOSED)
+
+    def make_open(self):
+        self.set_state(OPEN)
+
+    def make_barrier(self):
+        self.set_state(WALL)
+
+    def make_end(self):
+        self.set_state(END)
+
+    def make_path(self):
+        self.set_state(PATH)
+
+    def make_player1(self):
+        self.set_state(PLAYER1)
+
+    def make_player2(self):
+        self.set_state(PLAYER2)
+
+    def __lt__(self, other):
+        return False
+
+
+def display_popup_message(message):
+    TOASTS.show(message, POPUP_DURATION)
+
+
+SOLUTIONS = {}
+WORKER = SolveWorker()
+
+
+def solve(maze_id, maze):
+    # Solved once per stored maze on the worker thread, the reveal only
+    # replays the trace. A job that failed is dropped so the next match
+    # tries again, as does one cancelled before it ran. Generated mazes
+    # have no id and are never kept.
+    job = SOLUTIONS.get(maze_id)
+    if job is None or (job.done() and (job.future.cancelled() or job.future.exception() is not None)):
+        name = ALGORITHM if maze.costs is None else WEIGHTED_ALGORITHM
+        job = WORKER.submit(name, maze, trace=True, timeout=SOLVE_TIMEOUT)
+        if maze_id is not None:
+            SOLUTIONS[maze_id] = job
+    return job
+
+
+def make_grid(maze):
+    plane = state_plane(maze)
+    RENDERER.set_plane(plane, maze.rows, maze.cols, maze.costs)
+    return Grid(plane, maze.rows, maze.cols, Spot)
+
+
+def draw(win, grid, current_spot=None):
+    TOASTS.update()
+    if current_spot is None:
+        RENDERER.flush()
+    else:
+        RENDERER.follow(current_spot.index)
+        RENDERER.flush(current_spot.index)
+    TOASTS.draw()
+
+
+def save_path(path, file_name):
+    with open(file_name, 'w') as file:
+        json.dump(path, file)
+
+
+def load_maze(file_name):
+    try:
+        with open(file_name, 'r') as file:
+            maze_data = json.load(file)
+        return maze_data
+    except FileNotFoundError:
+        return None
+
+def main(win, width, store=None, cache=None):
+    with open('player1_path.json', 'w') as file:
+        pass 
+    with open('player2_path.json', 'w') as file:
+        pass
+    maze_id = None
+    if GENERATOR is None:
+        store = MazeStore() if store is None else store
+        maze_id = store.random_id()
+    if maze_id is not None:
+        cache = SolutionCache() if cache is None else cache
+        maze = store.load(maze_id)
+        dist = cache.distances(maze)
+    else:
+        # A new maze every match, so nothing about it is worth keeping.
+        maze = generate(GENERATOR or FALLBACK_GENERATOR, *MAZE_SIZE)
+        dist = distance_field(maze.plane, maze.rows, maze.cols, maze.end, costs=maze.costs)
+    grid = make_grid(maze)
+    display_popup_message("Player 1, it's your turn!")
+    player_turn = 1
+    player1_path = PlayerPath(maze.cols)
+    player2_path = PlayerPath(maze.cols)
+    game_over = False
+    job = None
+    revealed = False
+    run = True
+    clock = pygame.time.Clock()
+
+    start_spot = grid[maze.start]
+    end_spot = grid[maze.end]
+    current_spot = start_spot
+
+    while run:
+        draw(win, grid, current_spot)
+        clock.tick(FPS)
+        # Sleeps until there is input or the popup has to come down, and
+        # wakes up regularly while the AI is still solving.
+        timeout = TOASTS.timeout()
+        if job is not None and not revealed:
+            timeout = min(timeout or POLL_MS, POLL_MS)
+        for event in wait_events(timeout):
+            if event.type == pygame.QUIT:
+                run = False
+
+            if event.type == pygame.MOUSEWHEEL:
+                RENDERER.zoom(event.y)
+
+            if not game_over:
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_LEFT:
+                        if current_spot.row > 0:
+                            new_spot = grid[current_spot.index - maze.cols]
+                            if not new_spot.is_barrier():
+                                current_spot = new_spot
+                                if player_turn == 1:
+                                        if not current_spot.is_player1():
+                                            current_spot.make_player1()
+                                            player1_path.add(*current_spot.get_pos())
+                                else:
+                                    if not current_spot.is_player2():
+                                        current_spot.make_player2()
+                                        player2_path.add(*current_spot.get_pos())
+                    elif event.key == pygame.K_RIGHT:
+                        if current_spot.row < maze.rows - 1:
+                            new_spot = grid[current_spot.index + maze.cols]
+                            if not new_spot.is_barrier():
+                                current_spot = new_spot
+                                if player_turn == 1:
+                                        if not current_spot.is_player1():
+                                            current_spot.make_player1()
+                                            player1_path.add(*current_spot.get_pos())
+                                else:
+                                    if not current_spot.is_player2():
+                                        current_spot.make_player2()
+                                        player2_path.add(*current_spot.get_pos())
+                    elif event.key == pygame.K_UP:
+                        if current_spot.col > 0:
+                            new_spot = grid[current_spot.index - 1]
+                            if not new_spot.is_barrier():
+                                current_spot = new_spot
+                                if player_turn == 1:
+                                        if not current_spot.is_player1():
+                                            current_spot.make_player1()
+                                            player1_path.add(*current_spot.get_pos())
+                                else:
+                                    if not current_spot.is_player2():
+                                        current_spot.make_player2()
+                                        player2_path.add(*current_spot.get_pos())
+                    elif event.key == pygame.K_DOWN:
+                        if current_spot.col < maze.cols - 1:
+                            new_spot = grid[current_spot.index + 1]
+                            if not new_spot.is_barrier():
+                                current_spot = new_spot
+                                if player_turn == 1:
+                                        if not current_spot.is_player1():
+                                            current_spot.make_player1()
+                                            player1_path.add(*current_spot.get_pos())
+                                else:
+                                    if not current_spot.is_player2():
+                                        current_spot.make_player2()
+                                        player2_path.add(*current_spot.get_pos())
+                    elif event.key == pygame.K_x: 
+                        current_spot.reset()
+                        item_to_remove = current_spot.get_pos()
+                        if player_turn == 1:
+                            player1_path.remove(*item_to_remove)
+                        else:
+                            player2_path.remove(*item_to_remove)
+
+                  
+              
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_RETURN:
+                    if current_spot == end_spot:    
+                        if player_turn == 1:
+                            save_path(player1_path.positions(), "player1_path.json")
+                            display_popup_message("Player 2, it's your turn!")
+                            player_turn = 2
+                            current_spot = start_spot 
+                            game_over = False
+                        else:
+
+                            save_path(player2_path.positions(), "player2_path.json")
+                            display_popup_message("Game Over!")
+                            game_over = True
+                        player1_path.clear()
+                        player2_path.clear()
+                        grid = make_grid(maze)
+                        start_spot = grid[maze.start]
+                        end_spot = grid[maze.end]
+                        current_spot = grid[current_spot.index]
+
+                        # print("end spot  = " , end_spot.x, end_spot.y)
+                    else:
+                        # print("end spot  = " , end_spot.x, end_spot.y)
+                        # print ("current spot = ", current_spot.x, current_spot.y)
+                        display_popup_message("Invalid Moves!")        
+                        
+        if game_over and job is None and maze.start is not None and maze.end is not None:
+            job = solve(maze_id, maze)
+        if job is not None and not revealed and job.done():
+            revealed = True
+            try:
+                result = job.result()
+            except TimeoutError:
+                display_popup_message("The AI gave up!")
+            else:
+                animator = SearchAnimator(grid, job.stats, result.path, maze.start)
+                if not animator.play(lambda: draw(win, grid)):
+                    run = False
+        
+                            
+    if job is not None and not job.done():
+        job.cancel()
+    if(game_over):                                  
+        player1_path_data = load_maze("player1_path.json") or []
+        player2_path_data = load_maze("player2_path.json") or []
+    else:
+        player1_path_data = []
+        player2_path_data = []
+    # Fewest wasted steps wins, and on a draw the walk that covers more of
+    # the shortest paths.
+    size = maze.rows * maze.cols
+    best = optimal_bitmap(dist, maze.start, maze.cols, maze.costs)
+    cells1 = [maze.start] + [row * maze.cols + col for row, col in player1_path_data]
+    cells2 = [maze.start] + [row * maze.cols + col for row, col in player2_path_data]
+    score1 = judge(cells1, dist, maze.start, maze.costs)
+    score2 = judge(cells2, dist, maze.start, maze.costs)
+    pl1 = (-score1.wasted, overlap(bitmap(cells1, size), best).jaccard)
+    pl2 = (-score2.wasted, overlap(bitmap(cells2, size), best).jaccard)
+
+    win.fill(WHITE)
+    pygame.display.update()
+    if pl1 > pl2:
+        display_popup_message("Player 1 wins!")
+    elif pl2 > pl1:
+        display_popup_message("Player 2 wins!")
+    else:
+        display_popup_message("It's a tie!")
+    TOASTS.linger()
+ 
+if __name__ == "__main__":
+    main(open_window(), WIDTH)
+    pygame.quit()
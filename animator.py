@@ -0,0 +1,84 @@
+import pygame
+
+FPS = 60
+DURATION = 4.0  # seconds a whole replay takes at normal speed
+MAX_FAST = 64
+
+
+class SearchAnimator:
+    # Replays a recorded search (solver.SearchStats with trace=True) onto a
+    # grid of spots. The search has already finished, so each frame applies
+    # a batch of steps and draws once, and the replay takes about the same
+    # time on any maze size.
+    #
+    # Keys: space pauses, n steps once, f speeds up (wraps back to normal)
+    # and s or escape skips to the end.
+
+    def __init__(self, grid, stats, path, start, fps=FPS, duration=DURATION):
+        self.grid = grid
+        self.fps = fps
+        self.speed = self.base = max(1, round((stats.expanded + len(path)) / (fps * duration)))
+        self.paused = False
+        self.done = False
+        self.clock = pygame.time.Clock()
+        self._steps = self.steps(stats, path, start)
+
+    def steps(self, stats, path, start):
+        for current, opened in stats.replay():
+            for i in opened:
+                self.grid[i].make_open()
+            if current != start:
+                self.grid[current].make_closed()
+            yield
+        for i in reversed(path[1:-1]):
+            self.grid[i].make_path()
+            yield
+        if path:
+            self.grid[path[-1]].make_end()
+
+    def advance(self, count=None):
+        # Applies count steps, or every remaining one when count is None.
+        if count is None:
+            for _ in self._steps:
+                pass
+            self.done = True
+            return
+        for _ in range(count):
+            try:
+                next(self._steps)
+            except StopIteration:
+                self.done = True
+                return
+
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return False
+        if event.key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif event.key == pygame.K_n:
+            self.paused = True
+            self.advance(1)
+        elif event.key == pygame.K_f:
+            self.speed = self.base if self.speed >= self.base * MAX_FAST else self.speed * 2
+        elif event.key in (pygame.K_s, pygame.K_ESCAPE):
+            self.advance()
+        else:
+            return False
+        return True
+
+    def update(self):
+        if not self.paused and not self.done:
+            self.advance(self.speed)
+
+    def play(self, draw):
+        # Runs the replay to the end. Returns False if the window was closed.
+        while not self.done:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return False
+                self.handle(event)
+            self.update()
+            draw()
+            self.clock.tick(self.fps)
+        draw()
+        return True
@@ -1,6 +1,7 @@
 import pygame
 import math
-from queue import PriorityQueue
+
+from solver import astar, index, position, wall_plane
 
 WIDTH = 400
 WIN = pygame.display.set_mode((WIDTH, WIDTH))
@@ -24,7 +25,6 @@ class Spot:
 		self.x = row * width
 		self.y = col * width
 		self.color = WHITE
-		self.neighbors = []
 		self.width = width
 		self.total_rows = total_rows
 
@@ -70,81 +70,39 @@ class Spot:
 	def draw(self, win):
 		pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
 
-	def update_neighbors(self, grid):
-		self.neighbors = []
-		if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_barrier(): # DOWN
-			self.neighbors.append(grid[self.row + 1][self.col])
-
-		if self.row > 0 and not grid[self.row - 1][self.col].is_barrier(): # UP
-			self.neighbors.append(grid[self.row - 1][self.col])
-
-		if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_barrier(): # RIGHT
-			self.neighbors.append(grid[self.row][self.col + 1])
-
-		if self.col > 0 and not grid[self.row][self.col - 1].is_barrier(): # LEFT
-			self.neighbors.append(grid[self.row][self.col - 1])
-
 	def __lt__(self, other):
 		return False
 
 
-def h(p1, p2):
-	x1, y1 = p1
-	x2, y2 = p2
-	return abs(x1 - x2) + abs(y1 - y2)
-
-
-def reconstruct_path(came_from, current, draw):
-	while current in came_from:
-		current = came_from[current]
-		current.make_path()
-		draw()
+def algorithm(draw, grid, start, end):
+	rows = start.total_rows
+	plane = wall_plane((spot for row in grid for spot in row), rows, rows)
+	start_index = index(start.row, start.col, rows)
 
+	def spot_at(i):
+		row, col = position(i, rows)
+		return grid[row][col]
 
-def algorithm(draw, grid, start, end):
-	count = 0
-	open_set = PriorityQueue()
-	open_set.put((0, count, start))
-	came_from = {}
-	g_score = {spot: float("inf") for row in grid for spot in row}
-	g_score[start] = 0
-	f_score = {spot: float("inf") for row in grid for spot in row}
-	f_score[start] = h(start.get_pos(), end.get_pos())
-
-	open_set_hash = {start}
-
-	while not open_set.empty():
+	def visualize(current, opened):
 		for event in pygame.event.get():
 			if event.type == pygame.QUIT:
 				pygame.quit()
 
-		current = open_set.get()[2]
-		open_set_hash.remove(current)
-
-		if current == end:
-			reconstruct_path(came_from, end, draw)
-			end.make_end()
-			return True
-
-		for neighbor in current.neighbors:
-			temp_g_score = g_score[current] + 1
-
-			if temp_g_score < g_score[neighbor]:
-				came_from[neighbor] = current
-				g_score[neighbor] = temp_g_score
-				f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
-				if neighbor not in open_set_hash:
-					count += 1
-					open_set.put((f_score[neighbor], count, neighbor))
-					open_set_hash.add(neighbor)
-					neighbor.make_open()
-
+		for i in opened:
+			spot_at(i).make_open()
 		draw()
+		if current != start_index:
+			spot_at(current).make_closed()
 
-		if current != start:
-			current.make_closed()
+	result = astar(plane, rows, rows, start_index, index(end.row, end.col, rows), visualize)
+	if not result.path:
+		return False
 
-	return False
+	for i in reversed(result.path[:-1]):
+		spot_at(i).make_path()
+		draw()
+	end.make_end()
+	return True
 
 
 def make_grid(rows, width):
@@ -230,10 +188,6 @@ def main(win, width):
 
 			if event.type == pygame.KEYDOWN:
 				if event.key == pygame.K_SPACE and start and end:
-					for row in grid:
-						for spot in row:
-							spot.update_neighbors(grid)
-
 					algorithm(lambda: draw(win, grid, ROWS, width), grid, start, end)
 
 				if event.key == pygame.K_c:
@@ -0,0 +1,164 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tarfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import mazefile
+from solver import SOLVERS, WEIGHTED, SearchStats, solve
+
+FIELDS = ["name", "rows", "cols", "solved", "length", "expanded", "pushes", "stale", "open_peak", "scanned",
+          "seconds", "error"]
+
+
+def _read(read, *args):
+    # MazeFormatError is a ValueError, like mmap's complaint about an empty file.
+    try:
+        return read(*args), None
+    except (ValueError, OSError) as error:
+        return None, error
+
+
+def iter_mazes(source):
+    # Yields (name, Maze, None) from a directory tree, a zip/tar archive or a
+    # file, and (name, None, error) for a maze that cannot be read, so one
+    # bad file does not stop the rest.
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for file_name in sorted(files):
+                if file_name.endswith(".maze"):
+                    path = os.path.join(root, file_name)
+                    yield (os.path.relpath(path, source), *_read(mazefile.load, path))
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in archive.namelist():
+                if name.endswith(".maze"):
+                    yield (name, *_read(mazefile.parse, archive.read(name)))
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and member.name.endswith(".maze"):
+                    yield (member.name, *_read(mazefile.parse, archive.extractfile(member).read()))
+    else:
+        yield (os.path.basename(source), *_read(mazefile.load, source))
+
+
+def unsolved(name, maze=None, error=None):
+    return {"name": name, "rows": None if maze is None else maze.rows, "cols": None if maze is None else maze.cols,
+            "solved": False, "length": None, "expanded": 0, "pushes": 0, "stale": 0, "open_peak": 0,
+            "scanned": 0, "seconds": 0.0, "error": None if error is None else f"{type(error).__name__}: {error}"}
+
+
+def solve_shared(shm_name, rows, cols, start, end, algorithm, weighted=False):
+    # With weighted the terrain cost plane follows the wall plane.
+    n = rows * cols
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        plane = shm.buf[:n]
+        costs = shm.buf[n:2 * n] if weighted else None
+        stats = SearchStats()
+        try:
+            result = solve(algorithm, plane, rows, cols, start, end, stats=stats, costs=costs)
+        finally:
+            plane.release()
+            if costs is not None:
+                costs.release()
+    finally:
+        shm.close()
+    return result.cost, stats.as_dict(), result.seconds
+
+
+def share(maze, weighted=False):
+    n = maze.rows * maze.cols
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n if weighted else n))
+    shm.buf[:n] = maze.plane
+    if weighted:
+        shm.buf[n:2 * n] = maze.costs
+    return shm
+
+
+def run(source, algorithm, workers=None, in_flight=None):
+    # Keeps at most in_flight mazes in shared memory and yields one result
+    # row per maze as soon as it finishes, in completion order. Mazes that
+    # cannot be read or solved get an unsolved row with the error.
+    workers = workers or os.cpu_count() or 1
+    in_flight = in_flight or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def drain():
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, maze, shm = pending.pop(future)
+                shm.close()
+                shm.unlink()
+                try:
+                    cost, stats, seconds = future.result()
+                except Exception as error:
+                    yield unsolved(name, maze, error)
+                    continue
+                yield {
+                    "name": name, "rows": maze.rows, "cols": maze.cols, "solved": cost is not None,
+                    "length": cost, "expanded": stats["expanded"], "pushes": stats["pushes"],
+                    "stale": stats["stale"], "open_peak": stats["open_peak"], "scanned": stats["scanned"],
+                    "seconds": round(seconds, 6), "error": None,
+                }
+
+        try:
+            for name, maze, error in iter_mazes(source):
+                if error is not None or maze.start is None or maze.end is None:
+                    yield unsolved(name, maze, error)
+                    continue
+                # Unit cost algorithms solve terrain mazes by their walls alone.
+                weighted = maze.costs is not None and algorithm in WEIGHTED
+                shm = share(maze, weighted)
+                future = pool.submit(
+                    solve_shared, shm.name, maze.rows, maze.cols, maze.start, maze.end, algorithm, weighted)
+                pending[future] = (name, maze, shm)
+                if len(pending) >= in_flight:
+                    yield from drain()
+
+            while pending:
+                yield from drain()
+        finally:
+            # Left over when the source or the caller gave up half way.
+            for future, (_, _, shm) in pending.items():
+                future.cancel()
+                shm.close()
+                shm.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve every maze in a directory or archive.")
+    parser.add_argument("source", help="directory, .zip/.tar archive or single .maze file")
+    parser.add_argument("-a", "--algorithm", default="astar", choices=sorted(SOLVERS),
+                        help=f"terrain costs are only used by {', '.join(WEIGHTED)}")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-f", "--format", default="jsonl", choices=["jsonl", "csv"])
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout")
+    args = parser.parse_args(argv)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            def write(row):
+                out.write(json.dumps(row) + "\n")
+
+        for row in run(args.source, args.algorithm, args.workers):
+            write(row)
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
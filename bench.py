@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+import hpa
+import mazefile
+from cellstate import FLOOR, MUD, PATH, ROAD, WATER, Grid, state_plane
+from mazefile import Maze
+from mazegen import generate
+from renderer import GridRenderer
+from solver import FREE, SOLVERS, WALL, WEIGHTED, distance_field, solve
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+HISTORY_FILE = "benchmarks.jsonl"
+SIZES = [20, 64, 256, 1024, 2048]
+DENSITIES = [0.0, 0.2, 0.35]
+REGRESSION = 0.8
+
+
+def noise_maze(size, density, seed=0):
+    rng = random.Random(seed)
+    plane = bytearray(WALL if rng.random() < density else FREE for _ in range(size * size))
+    plane[0] = plane[-1] = FREE
+    return Maze(size, size, 0, size * size - 1, plane)
+
+
+def corridor_maze(size, seed=0):
+    return generate("backtracker", size, size, seed)
+
+
+def terrain_maze(size, seed=0):
+    rng = random.Random(seed)
+    maze = corridor_maze(size, seed)
+    return maze._replace(costs=bytes(rng.choice((ROAD, FLOOR, FLOOR, MUD, WATER)) for _ in range(size * size)))
+
+
+def peak_rss_kib():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def measure(func, min_time=0.2, max_repeat=50):
+    # Runs func until min_time has passed and keeps the best lap, then
+    # once more under tracemalloc for the allocation peak.
+    best = float("inf")
+    laps = 0
+    started = time.perf_counter()
+    while laps < max_repeat and (laps == 0 or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+        laps += 1
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, laps, peak
+
+
+def solver_cases(sizes, algorithms):
+    for size in sizes:
+        mazes = [("corridors", corridor_maze(size))]
+        mazes += [(f"noise{density:g}", noise_maze(size, density)) for density in DENSITIES]
+        for kind, maze in mazes:
+            for name in algorithms:
+                yield (f"solve.{name}", size, kind,
+                       lambda m=maze, n=name: solve(n, m.plane, m.rows, m.cols, m.start, m.end))
+            yield ("distance_field", size, kind,
+                   lambda m=maze: distance_field(m.plane, m.rows, m.cols, m.end))
+        maze = terrain_maze(size)
+        for name in algorithms:
+            if name in WEIGHTED:
+                yield (f"solve.{name}", size, "terrain",
+                       lambda m=maze, n=name: solve(n, m.plane, m.rows, m.cols, m.start, m.end, costs=m.costs))
+
+
+def hpa_cases(sizes):
+    # Not run by default: building the graph of a big maze takes a while.
+    for size in sizes:
+        for kind, maze in (("corridors", corridor_maze(size)), ("noise0.2", noise_maze(size, 0.2))):
+            yield "hpa.build", size, kind, lambda m=maze: hpa.build(m)
+            graph = hpa.build(maze)
+            yield "hpa.query", size, kind, lambda g=graph, m=maze: hpa.query(g, m, m.start, m.end)
+            yield "hpa.solve", size, kind, lambda g=graph, m=maze: hpa.hpa(g, m, m.start, m.end)
+
+
+def loader_cases(sizes):
+    for size in sizes:
+        maze = corridor_maze(size)
+        data = mazefile.dumps(maze)
+        yield "mazefile.dumps", size, "corridors", lambda m=maze: mazefile.dumps(m)
+        yield "mazefile.parse", size, "corridors", lambda d=data: mazefile.parse(d)
+
+
+def grid_cases(sizes):
+    for size in sizes:
+        maze = corridor_maze(size)
+        yield ("make_grid", size, "corridors",
+               lambda m=maze: Grid(state_plane(m), m.rows, m.cols, lambda grid, i: i))
+
+
+def renderer_cases(sizes):
+    win = pygame.display.set_mode((800, 800))
+    for size in sizes:
+        maze = corridor_maze(size)
+        renderer = GridRenderer(win)
+        renderer.set_plane(state_plane(maze), maze.rows, maze.cols)
+        path = solve("bfs", maze.plane, maze.rows, maze.cols, maze.start, maze.end).path
+
+        def draw_path(r=renderer, p=path):
+            for i in p:
+                r.plane[i] = PATH
+                r.mark(i)
+            r.flush(p[-1])
+
+        def scroll(r=renderer):
+            r.scroll(8, 8)
+            r.flush()
+            r.scroll(-8, -8)
+            r.flush()
+
+        yield "renderer.rebuild", size, "corridors", renderer.rebuild
+        yield "renderer.draw_path", size, "corridors", draw_path
+        renderer.zoom(4)
+        yield "renderer.scroll", size, "corridors", scroll
+
+
+def commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def last_results(history_file):
+    last = {}
+    try:
+        with open(history_file, "r") as file:
+            for line in file:
+                record = json.loads(line)
+                last[record["case"], record["size"], record["kind"]] = record
+    except FileNotFoundError:
+        pass
+    return last
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the solver, loader and renderer hot paths.")
+    parser.add_argument("-s", "--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("-a", "--algorithms", nargs="+", default=sorted(SOLVERS), choices=sorted(SOLVERS))
+    parser.add_argument("-g", "--groups", nargs="+", default=["solver", "loader", "grid", "renderer"],
+                        choices=["solver", "loader", "grid", "renderer", "hpa"])
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to spend on each case")
+    parser.add_argument("-o", "--history", default=HISTORY_FILE)
+    parser.add_argument("--threshold", type=float, default=REGRESSION,
+                        help="flag cases slower than this fraction of the last recorded run")
+    parser.add_argument("--no-save", action="store_true", help="print results without recording them")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    previous = last_results(args.history)
+    run = {"commit": commit(), "python": platform.python_version(), "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    groups = {
+        "solver": lambda: solver_cases(args.sizes, args.algorithms),
+        "loader": lambda: loader_cases(args.sizes),
+        "grid": lambda: grid_cases(args.sizes),
+        "renderer": lambda: renderer_cases(args.sizes),
+        "hpa": lambda: hpa_cases(args.sizes),
+    }
+    regressions = 0
+    out = None if args.no_save else open(args.history, "a")
+    try:
+        for group in args.groups:
+            for case, size, kind, func in groups[group]():
+                seconds, laps, peak = measure(func, args.min_time)
+                record = dict(run, case=case, size=size, kind=kind, seconds=seconds, laps=laps,
+                              ops_per_sec=1 / seconds if seconds else None,
+                              alloc_peak_kib=peak // 1024, peak_rss_kib=peak_rss_kib())
+                note = ""
+                before = previous.get((case, size, kind))
+                if before and before["ops_per_sec"] and record["ops_per_sec"]:
+                    ratio = record["ops_per_sec"] / before["ops_per_sec"]
+                    note = f" {ratio:.2f}x vs {before['commit']}"
+                    if ratio < args.threshold:
+                        note += " REGRESSION"
+                        regressions += 1
+                print(f"{case:20} {size:>5}² {kind:10} {record['ops_per_sec']:>12,.2f} ops/s "
+                      f"{record['alloc_peak_kib']:>9,} KiB alloc{note}", flush=True)
+                if out is not None:
+                    out.write(json.dumps(record) + "\n")
+                    out.flush()
+    finally:
+        if out is not None:
+            out.close()
+        pygame.quit()
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
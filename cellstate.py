@@ -0,0 +1,89 @@
+from mazefile import Maze
+from solver import FREE, WALL
+
+START = 2
+END = 3
+PLAYER1 = 4
+PLAYER2 = 5
+OPEN = 6
+CLOSED = 7
+PATH = 8
+
+# Colours only exist at draw time, indexed by state.
+PALETTE = (
+    (255, 255, 255),  # FREE
+    (0, 0, 0),        # WALL
+    (255, 165, 0),    # START
+    (64, 224, 208),   # END
+    (0, 0, 255),      # PLAYER1
+    (255, 255, 0),    # PLAYER2
+    (0, 255, 0),      # OPEN
+    (255, 0, 0),      # CLOSED
+    (128, 0, 128),    # PATH
+)
+
+# Terrain costs, what it takes to step onto a free cell. Plain floor costs
+# 2 so that roads can be cheaper than it.
+ROAD = 1
+FLOOR = 2
+MUD = 4
+WATER = 8
+TERRAIN = {"road": ROAD, "floor": FLOOR, "mud": MUD, "water": WATER}
+
+# Free cells are tinted by their terrain, plain floor keeps the FREE colour.
+TERRAIN_PALETTE = {
+    ROAD: (200, 200, 200),
+    MUD: (150, 100, 50),
+    WATER: (120, 170, 255),
+}
+
+_WALLS_ONLY = bytes(WALL if state == WALL else FREE for state in range(256))
+
+
+def state_plane(maze):
+    plane = bytearray(maze.plane)
+    if maze.start is not None:
+        plane[maze.start] = START
+    if maze.end is not None:
+        plane[maze.end] = END
+    return plane
+
+
+def _find(plane, state):
+    i = plane.find(bytes([state]))
+    return None if i == -1 else i
+
+
+def cost_plane(rows, cols):
+    return bytearray([FLOOR]) * (rows * cols)
+
+
+def to_maze(plane, rows, cols, costs=None):
+    costs = None if costs is None else bytes(costs)
+    return Maze(rows, cols, _find(plane, START), _find(plane, END), plane.translate(_WALLS_ONLY), costs)
+
+
+class Grid:
+    # Sequence of spot views over a state plane. Spots are made on access,
+    # so memory scales with the plane and not with one object per cell.
+
+    def __init__(self, plane, rows, cols, spot):
+        self.plane = plane
+        self.rows = rows
+        self.cols = cols
+        self.spot = spot
+
+    def __len__(self):
+        return len(self.plane)
+
+    def __getitem__(self, i):
+        if not 0 <= i < len(self.plane):
+            raise IndexError(i)
+        return self.spot(self, i)
+
+    def __iter__(self):
+        for i in range(len(self.plane)):
+            yield self.spot(self, i)
+
+    def at(self, row, col):
+        return self.spot(self, row * self.cols + col)
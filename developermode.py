@@ -1,276 +1,345 @@
 import pygame
 import math
-from queue import PriorityQueue
-import json
-import os
+import sys
+from concurrent.futures import CancelledError
+
+from animator import SearchAnimator
+from cellstate import CLOSED, END, FLOOR, OPEN, PALETTE, PATH, START, TERRAIN, Grid, cost_plane, to_maze
+from edittools import brush, flood_fill, invert, line, rectangle
+from mazecheck import check
+from mazestore import MazeStore
+from planner import LPAStar
+from renderer import GridRenderer
+from solutioncache import SolutionCache
+from solveworker import SolveWorker
+from solver import FREE, WALL
+from toasts import FPS, Toasts, wait_events
 
 WIDTH = 400
-WIN = pygame.display.set_mode((WIDTH, WIDTH))
-pygame.display.set_caption("A* Path Finding Algorithm")
-
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 255, 0)
-YELLOW = (255, 255, 0)
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-PURPLE = (128, 0, 128)
-ORANGE = (255, 165, 0)
-GREY = (128, 128, 128)
-TURQUOISE = (64, 224, 208)
+POPUP_FONT_SIZE = 24
+POPUP_DURATION = 3000
+WIN = None
+RENDERER = GridRenderer(WIN)
+TOASTS = Toasts(WIN, RENDERER, (WIDTH // 2, 20), POPUP_FONT_SIZE, (255, 255, 255), (0, 0, 0))
+WORKER = SolveWorker()
+POLL_MS = 50
+PLANNER_UPDATES = 4096  # edits bigger than this rebuild the planner
+PLANNER_BUDGET = 2000  # expansions per frame, so big repairs never stall drawing
+TOOL_KEYS = {
+    pygame.K_b: "brush",
+    pygame.K_l: "line",
+    pygame.K_r: "rectangle",
+    pygame.K_f: "fill",
+}
+MATERIALS = ("wall", "road", "mud", "water")  # cycled with T
+PAN_KEYS = {
+    pygame.K_LEFT: (-8, 0),
+    pygame.K_RIGHT: (8, 0),
+    pygame.K_UP: (0, -8),
+    pygame.K_DOWN: (0, 8),
+}
+
+def open_window():
+    # pygame is only started here, so importing the editor opens nothing.
+    global WIN
+    pygame.init()
+    WIN = pygame.display.set_mode((WIDTH, WIDTH))
+    pygame.display.set_caption("A* Path Finding Algorithm")
+    RENDERER.win = WIN
+    TOASTS.win = WIN
+    return WIN
+
 
 class Spot:
-    def __init__(self, row, col, width, total_rows):
-        self.row = row
-        self.col = col
-        self.x = row * width
-        self.y = col * width
-        self.color = WHITE
-        self.neighbors = []
-        self.width = width
-        self.total_rows = total_rows
+    def __init__(self, grid, index):
+        self.plane = grid.plane
+        self.index = index
+        self.row, self.col = divmod(index, grid.cols)
+
+    def __eq__(self, other):
+        return isinstance(other, Spot) and self.index == other.index and self.plane is other.plane
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def color(self):
+        return PALETTE[self.plane[self.index]]
+
+    def set_state(self, state):
+        self.plane[self.index] = state
+        RENDERER.mark(self.index)
 
     def get_pos(self):
         return self.row, self.col
 
     def is_closed(self):
-        return self.color == RED
+        return self.plane[self.index] == CLOSED
 
     def is_open(self):
-        return self.color == GREEN
+        return self.plane[self.index] == OPEN
 
     def is_barrier(self):
-        return self.color == BLACK
+        return self.plane[self.index] == WALL
 
     def is_start(self):
-        return self.color == ORANGE
+        return self.plane[self.index] == START
 
     def is_end(self):
-        return self.color == TURQUOISE
+        return self.plane[self.index] == END
 
     def reset(self):
-        self.color = WHITE
+        self.set_state(FREE)
 
     def make_start(self):
-        self.color = ORANGE
+        self.set_state(START)
 
     def make_closed(self):
-        self.color = RED
+        self.set_state(CLOSED)
 
     def make_open(self):
-        self.color = GREEN
+        self.set_state(OPEN)
 
     def make_barrier(self):
-        self.color = BLACK
+        self.set_state(WALL)
 
     def make_end(self):
-        self.color = TURQUOISE
+        self.set_state(END)
 
     def make_path(self):
-        self.color = PURPLE
-
-    def draw(self, win):
-        pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.width))
-
-    def update_neighbors(self, grid):
-        self.neighbors = []
-        if self.row < self.total_rows - 1 and not grid[self.row + 1][self.col].is_barrier():  # DOWN
-            self.neighbors.append(grid[self.row + 1][self.col])
-
-        if self.row > 0 and not grid[self.row - 1][self.col].is_barrier():  # UP
-            self.neighbors.append(grid[self.row - 1][self.col])
-
-        if self.col < self.total_rows - 1 and not grid[self.row][self.col + 1].is_barrier():  # RIGHT
-            self.neighbors.append(grid[self.row][self.col + 1])
-
-        if self.col > 0 and not grid[self.row][self.col - 1].is_barrier():  # LEFT
-            self.neighbors.append(grid[self.row][self.col - 1])
+        self.set_state(PATH)
 
     def __lt__(self, other):
         return False
 
 
-def h(p1, p2):
-    x1, y1 = p1
-    x2, y2 = p2
-    return abs(x1 - x2) + abs(y1 - y2)
-
-
-def reconstruct_path(came_from, current, draw):
-    while current in came_from:
-        current = came_from[current]
-        current.make_path()
-        draw()
-
-
-def algorithm(draw, grid, start, end):
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
-    came_from = {}
-    g_score = {spot: float("inf") for row in grid for spot in row}
-    g_score[start] = 0
-    f_score = {spot: float("inf") for row in grid for spot in row}
-    f_score[start] = h(start.get_pos(), end.get_pos())
-    open_set_hash = {start}
-
-    while not open_set.empty():
-        for event in pygame.event.get():
+def algorithm(draw, grid, start, end, costs=None):
+    # The search runs on the worker thread while the window stays live and
+    # escape cancels it. The animator replays it afterwards.
+    maze = to_maze(grid.plane, grid.rows, grid.cols, costs)._replace(start=start.index, end=end.index)
+    job = WORKER.submit("astar" if costs is None else "dial", maze, trace=True)
+    while not job.done():
+        for event in wait_events(POLL_MS):
             if event.type == pygame.QUIT:
-                pygame.quit()
-
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
-
-        if current == end:
-            reconstruct_path(came_from, end, draw)
-            end.make_end()
-            return True
-
-        for neighbor in current.neighbors:
-            temp_g_score = g_score[current] + 1
-            if temp_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = temp_g_score
-                f_score[neighbor] = temp_g_score + h(neighbor.get_pos(), end.get_pos())
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((f_score[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
-                    neighbor.make_open()
-
+                job.cancel()
+                pygame.event.post(event)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                job.cancel()
         draw()
+    try:
+        result = job.result()
+    except CancelledError:
+        return False
+    if not result.path:
+        return False
+    if not SearchAnimator(grid, job.stats, result.path, start.index).play(draw):
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+    return True
 
-        if current != start:
-            current.make_closed()
-
-    return False
-
-
-def make_grid(rows, width):
-    grid = []
-    gap = width // rows
-    for i in range(rows):
-        grid.append([])
-        for j in range(rows):
-            spot = Spot(i, j, gap, rows)
-            grid[i].append(spot)
 
-    return grid
+def show_path(grid, path, shown):
+    # Repaints only the cells that joined or left the live path.
+    path = set(path)
+    for i in shown - path:
+        if grid.plane[i] == PATH:
+            grid[i].reset()
+    for i in path:
+        if grid.plane[i] != PATH:
+            grid[i].make_path()
+    return path
 
 
-def draw_grid(win, rows, width):
-    gap = width // rows
-    for i in range(rows):
-        pygame.draw.line(win, GREY, (0, i * gap), (width, i * gap))
-        for j in range(rows):
-            pygame.draw.line(win, GREY, (j * gap, 0), (j * gap, width))
+def apply_edit(grid, spans, start, end):
+    # Queues the painted spans for the renderer and puts the start and end
+    # back if a tool painted over them. Returns how many cells were painted.
+    for span in spans:
+        RENDERER.mark_span(*span)
+    for spot, state in ((start, START), (end, END)):
+        if spot is not None and grid.plane[spot.index] != state:
+            spot.set_state(state)
+    return sum(col1 - col0 for _, col0, col1 in spans)
 
 
-def draw(win, grid, rows, width):
-    win.fill(WHITE)
+def make_grid(rows, cols):
+    plane = bytearray(rows * cols)
+    RENDERER.set_plane(plane, rows, cols)
+    return Grid(plane, rows, cols, Spot)
 
-    for row in grid:
-        for spot in row:
-            spot.draw(win)
 
-    draw_grid(win, rows, width)
-    pygame.display.update()
+def draw(win, grid):
+    TOASTS.update()
+    RENDERER.flush()
+    TOASTS.draw()
 
 
-def get_clicked_pos(pos, rows, width):
-    gap = width // rows
-    y, x = pos
-    row = y // gap
-    col = x // gap
-    return row, col
+def get_clicked_pos(grid, pos):
+    i = RENDERER.cell_at(pos)
+    return None if i is None else grid[i]
 
 
-def load_maze(file_name):
-    try:
-        with open(file_name, 'r') as file:
-            maze_data = json.load(file)
-        return maze_data
-    except FileNotFoundError:
+def save_maze(grid, store, cache, costs=None):
+    maze = to_maze(grid.plane, grid.rows, grid.cols, costs)
+    problems = check(maze).problems
+    if problems:
+        TOASTS.show("Not saved: " + ", ".join(problems), POPUP_DURATION)
         return None
+    maze_id = store.save(maze)
+    # Warms the distance field the game scores players with.
+    cache.distances(maze)
+    return maze_id
 
 
-def save_maze(grid, file_name, run_id):
-    file_name = f'maze{run_id}.json'
-
-    maze = load_maze(file_name)  
-    new_maze = []
-
-    for row in grid:
-        for spot in row:
-            new_maze.append((spot.row, spot.col, spot.color))
-
-    if maze:
-        maze.extend(new_maze)
-    else:
-        maze = new_maze
-
-    with open(file_name, 'w') as file:
-        json.dump(maze, file)
-
-
-def main(win, width):
-    ROWS = 20
-    grid = make_grid(ROWS, width)
+def main(win, rows=20, cols=20, store=None, cache=None):
+    grid = make_grid(rows, cols)
 
     start = None
     end = None
+    # Keeps the shortest path on screen while walls are drawn and erased.
+    planner = None
+    shown = set()
+    replan = False
+    tool = "brush"
+    material = "wall"
+    radius = 0
+    # Terrain costs, made the first time terrain is painted.
+    costs = None
+    layer = None
+    paint = None
+    anchor = None
+    last = None
+
+    def pick(button):
+        # The plane a press of button paints on and the value it paints.
+        nonlocal costs, planner
+        if material == "wall":
+            return grid.plane, WALL if button == 1 else FREE
+        if costs is None:
+            costs = cost_plane(rows, cols)
+            RENDERER.costs = costs
+            planner = None
+        return costs, TERRAIN[material] if button == 1 else FLOOR
+
+    def edit(spans):
+        nonlocal planner, replan
+        painted = apply_edit(grid, spans, start, end)
+        if planner is None:
+            return
+        if painted > PLANNER_UPDATES:
+            planner = LPAStar(grid.plane, rows, cols, start.index, end.index, costs)
+        else:
+            for row, col0, col1 in spans:
+                for i in range(row * cols + col0, row * cols + col1):
+                    planner.update(i)
+        replan = True
 
     run = True
-    run_id = 4
+    store = MazeStore() if store is None else store
+    cache = SolutionCache() if cache is None else cache
+    clock = pygame.time.Clock()
     while run:
-        draw(win, grid, ROWS, width)
-        for event in pygame.event.get():
+        draw(win, grid)
+        clock.tick(FPS)
+        # While the planner is still catching up, only poll for input.
+        timeout = TOASTS.timeout() if planner is None or planner.settled() else 1
+        for event in wait_events(timeout):
             if event.type == pygame.QUIT:
                 run = False
 
-            if pygame.mouse.get_pressed()[0]:  
-                pos = pygame.mouse.get_pos()
-                row, col = get_clicked_pos(pos, ROWS, width)
-                spot = grid[row][col]
-                if not start and spot != end:
+            if event.type == pygame.MOUSEWHEEL:
+                RENDERER.zoom(event.y)
+
+            spot = None
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
+                spot = get_clicked_pos(grid, event.pos)
+
+            if spot is not None:
+                if event.button == 1 and not start and spot != end:
                     start = spot
                     start.make_start()
 
-                elif not end and spot != start:
+                elif event.button == 1 and not end and spot != start:
                     end = spot
                     end.make_end()
 
-                elif spot != end and spot != start:
-                    spot.make_barrier()
-
-            elif pygame.mouse.get_pressed()[2]:  
-                pos = pygame.mouse.get_pos()
-                row, col = get_clicked_pos(pos, ROWS, width)
-                spot = grid[row][col]
-                spot.reset()
-                if spot == start:
-                    start = None
-                elif spot == end:
-                    end = None
+                elif event.button == 3 and (spot == start or spot == end):
+                    spot.reset()
+                    if spot == start:
+                        start = None
+                    else:
+                        end = None
+                    planner = None
+                    shown = show_path(grid, (), shown)
+
+                else:
+                    layer, paint = pick(event.button)
+                    if tool == "fill":
+                        edit(flood_fill(grid.plane, rows, cols, spot.index, paint, layer))
+                    elif tool == "brush":
+                        edit(brush(layer, rows, cols, [spot.index], radius, paint))
+                        last = spot.index
+                    else:
+                        anchor = spot.index
+
+                if start and end and planner is None:
+                    planner = LPAStar(grid.plane, rows, cols, start.index, end.index, costs)
+                    replan = True
+
+            if event.type == pygame.MOUSEMOTION and paint is not None and last is not None:
+                # Fast drags skip cells, so the brush follows a line between samples.
+                i = RENDERER.cell_at(event.pos)
+                if i is not None:
+                    edit(brush(layer, rows, cols, line(last, i, cols), radius, paint))
+                    last = i
+
+            elif event.type == pygame.MOUSEBUTTONUP and paint is not None:
+                i = RENDERER.cell_at(event.pos)
+                if anchor is not None and i is not None:
+                    if tool == "line":
+                        edit(brush(layer, rows, cols, line(anchor, i, cols), radius, paint))
+                    else:
+                        edit(rectangle(layer, rows, cols, anchor, i, paint))
+                paint = anchor = last = None
 
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and start and end:
-                    for row in grid:
-                        for spot in row:
-                            spot.update_neighbors(grid)
+                if event.key in PAN_KEYS:
+                    RENDERER.scroll(*PAN_KEYS[event.key])
+
+                if event.key in TOOL_KEYS or event.key == pygame.K_t:
+                    if event.key == pygame.K_t:
+                        material = MATERIALS[(MATERIALS.index(material) + 1) % len(MATERIALS)]
+                    else:
+                        tool = TOOL_KEYS[event.key]
+                    pygame.display.set_caption(f"A* Path Finding Algorithm - {tool}, {material}")
 
-                    algorithm(lambda: draw(win, grid, ROWS, width), grid, start, end)
-                    
-                   
+                if event.key == pygame.K_LEFTBRACKET:
+                    radius = max(0, radius - 1)
+                elif event.key == pygame.K_RIGHTBRACKET:
+                    radius += 1
 
-                if event.key == pygame.K_c:
+                if event.key == pygame.K_i:
+                    edit(invert(grid.plane, rows, cols))
+
+                if event.key == pygame.K_SPACE and start and end:
+                    algorithm(lambda: draw(win, grid), grid, start, end, costs)
+                    shown = set()
+
+                if event.key == pygame.K_c and save_maze(grid, store, cache, costs) is not None:
                     start = None
                     end = None
-                    save_maze(grid, "maze.json", run_id)
-                    run_id += 1
-                    grid = make_grid(ROWS, width)
+                    costs = None
+                    planner = None
+                    shown = set()
+                    grid = make_grid(rows, cols)
+
+        if planner is not None and (replan or not planner.settled()):
+            planner.compute(PLANNER_BUDGET)
+            if planner.settled():
+                shown = show_path(grid, planner.path()[1:-1], shown)
+        replan = False
+
 
+# python developermode.py [rows] [cols]
+if __name__ == "__main__":
+    main(open_window(), *map(int, sys.argv[1:3]))
     pygame.quit()
 
-main(WIN, WIDTH)
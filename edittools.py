@@ -0,0 +1,96 @@
+from solver import FREE, WALL
+
+# Every tool writes whole runs of cells along a row with one slice
+# assignment and returns those runs as (row, first col, end col) spans, so
+# the renderer and the planner can pick up the change in one go.
+
+_IS_WALL = bytes(1 if state == WALL else 0 for state in range(256))
+_INVERT = bytes(FREE if state == WALL else WALL for state in range(256))
+
+
+def line(a, b, cols):
+    # Cells on the segment from a to b, stepping one axis at a time so a
+    # wall drawn with it has no diagonal gaps to slip through.
+    row, col = divmod(a, cols)
+    end_row, end_col = divmod(b, cols)
+    drow, dcol = abs(end_row - row), abs(end_col - col)
+    srow = 1 if end_row > row else -1
+    scol = 1 if end_col > col else -1
+    i = j = 0
+    yield a
+    while i < drow or j < dcol:
+        if (1 + 2 * i) * dcol < (1 + 2 * j) * drow:
+            row += srow
+            i += 1
+        else:
+            col += scol
+            j += 1
+        yield row * cols + col
+
+
+def _fill_span(plane, cols, row, col0, col1, state):
+    base = row * cols
+    plane[base + col0:base + col1] = bytes([state]) * (col1 - col0)
+    return row, col0, col1
+
+
+def brush(plane, rows, cols, cells, radius, state):
+    spans = []
+    for i in cells:
+        row, col = divmod(i, cols)
+        col0, col1 = max(0, col - radius), min(cols, col + radius + 1)
+        for r in range(max(0, row - radius), min(rows, row + radius + 1)):
+            spans.append(_fill_span(plane, cols, r, col0, col1, state))
+    return spans
+
+
+def rectangle(plane, rows, cols, a, b, state):
+    row0, col0 = divmod(a, cols)
+    row1, col1 = divmod(b, cols)
+    row0, row1 = sorted((row0, row1))
+    col0, col1 = sorted((col0, col1))
+    return [_fill_span(plane, cols, row, col0, col1 + 1, state) for row in range(row0, row1 + 1)]
+
+
+def flood_fill(plane, rows, cols, i, state, into=None):
+    # Scanline fill of the 4-connected region of walls, or of open cells,
+    # around i. Run ends are found with find()/rfind() on a per-cell class
+    # copy of the plane, where filled runs are marked 2. The region is
+    # written into another plane instead when given, such as a terrain cost
+    # plane.
+    into = plane if into is None else into
+    classes = plane.translate(_IS_WALL)
+    target = bytes([classes[i]])
+    other, filled = bytes([1 - classes[i]]), b"\x02"
+    spans = []
+    stack = [divmod(i, cols)]
+    while stack:
+        row, col = stack.pop()
+        base = row * cols
+        if classes[base + col] != target[0]:
+            continue
+        left = max(classes.rfind(other, base, base + col), classes.rfind(filled, base, base + col), base - 1) + 1
+        right = classes.find(other, base + col, base + cols)
+        right2 = classes.find(filled, base + col, base + cols)
+        right = min(end for end in (right, right2, base + cols) if end != -1)
+        classes[left:right] = filled * (right - left)
+        spans.append(_fill_span(into, cols, row, left - base, right - base, state))
+        for next_row in (row - 1, row + 1):
+            if not 0 <= next_row < rows:
+                continue
+            shift = (next_row - row) * cols
+            j, limit = left + shift, right + shift
+            while j < limit:
+                j = classes.find(target, j, limit)
+                if j == -1:
+                    break
+                stack.append((next_row, j - base - shift))
+                end = classes.find(other, j, limit)
+                end2 = classes.find(filled, j, limit)
+                j = min(end for end in (end, end2, limit) if end != -1)
+    return spans
+
+
+def invert(plane, rows, cols):
+    plane[:] = plane.translate(_INVERT)
+    return [(row, 0, cols) for row in range(rows)]
@@ -0,0 +1,389 @@
+import argparse
+import heapq
+import random
+import struct
+import sys
+import time
+from array import array
+
+import mazefile
+from mazefile import MazeFormatError
+from solver import DOWN, LEFT, RIGHT, UP, WALL, SolveResult, passability, solve
+
+# Hierarchical pathfinding (HPA*). The maze is cut into CLUSTER x CLUSTER
+# blocks. Wherever two neighbouring blocks share an opening, the cells on
+# both sides of it become nodes of a small abstract graph. Its edges are
+# the single steps across openings plus the shortest paths between the
+# nodes of one block, found once per maze. A query only searches inside
+# the start and goal blocks, then over the abstract graph, and refine()
+# fills in the cells one block at a time. Paths are near-optimal: they
+# always pass through the chosen opening cells.
+
+CLUSTER = 16
+LONG_ENTRANCE = 6  # openings this wide get a node at both ends, not one in the middle
+
+# Layout (little endian):
+#   magic "AHPA", version u8, reserved u8, cluster u16,
+#   rows u32, cols u32, nodes u32, edges u32,
+#   then i32 arrays: cluster_first (clusters + 1), nodes,
+#   edge_first (nodes + 1), edge_to and edge_cost.
+MAGIC = b"AHPA"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIIII")
+
+
+class AbstractGraph:
+    # Nodes are cells, grouped by block: the nodes of block b are
+    # nodes[cluster_first[b]:cluster_first[b + 1]]. The edges of node k are
+    # edge_to/edge_cost[edge_first[k]:edge_first[k + 1]], in node numbers.
+
+    def __init__(self, rows, cols, cluster, cluster_first, nodes, edge_first, edge_to, edge_cost):
+        self.rows = rows
+        self.cols = cols
+        self.cluster = cluster
+        self.cluster_cols = -(-cols // cluster)
+        self.cluster_first = cluster_first
+        self.nodes = nodes
+        self.edge_first = edge_first
+        self.edge_to = edge_to
+        self.edge_cost = edge_cost
+        self.node_of = {cell: k for k, cell in enumerate(nodes)}
+
+    def cluster_of(self, i):
+        row, col = divmod(i, self.cols)
+        return (row // self.cluster) * self.cluster_cols + col // self.cluster
+
+    def box(self, b):
+        # Cell bounds of block b as row0, row1, col0, col1, ends exclusive.
+        row, col = divmod(b, self.cluster_cols)
+        row0, col0 = row * self.cluster, col * self.cluster
+        return row0, min(self.rows, row0 + self.cluster), col0, min(self.cols, col0 + self.cluster)
+
+    def cluster_nodes(self, b):
+        return self.nodes[self.cluster_first[b]:self.cluster_first[b + 1]]
+
+
+def _step_cost(costs, i):
+    return 1 if costs is None else costs[i]
+
+
+def _local(mask, costs, cols, box, source, targets):
+    # Dijkstra from source that never leaves box and stops once every target
+    # is settled, breadth-first when every step costs 1. Returns the settled
+    # costs and the predecessor of each cell.
+    if costs is None:
+        return _local_bfs(mask, cols, box, source, targets)
+    row0, row1, col0, col1 = box
+    g = {source: 0}
+    came_from = {source: -1}
+    settled = {}
+    left = len(targets)
+    heap = [(0, source)]
+    while heap and left:
+        d, current = heapq.heappop(heap)
+        if current in settled:
+            continue
+        settled[current] = d
+        if current in targets:
+            left -= 1
+        bits = mask[current]
+        row, col = divmod(current, cols)
+        for bit, step, inside in ((DOWN, cols, row + 1 < row1), (UP, -cols, row > row0),
+                                  (RIGHT, 1, col + 1 < col1), (LEFT, -1, col > col0)):
+            if not bits & bit or not inside:
+                continue
+            neighbor = current + step
+            cost = d + (1 if costs is None else costs[neighbor])
+            old = g.get(neighbor)
+            if old is None or cost < old:
+                g[neighbor] = cost
+                came_from[neighbor] = current
+                heapq.heappush(heap, (cost, neighbor))
+    return settled, came_from
+
+
+def _local_bfs(mask, cols, box, source, targets):
+    row0, row1, col0, col1 = box
+    settled = {source: 0}
+    came_from = {source: -1}
+    left = len(targets) - (source in targets)
+    frontier = [source]
+    d = 0
+    while frontier and left > 0:
+        d += 1
+        next_frontier = []
+        for current in frontier:
+            bits = mask[current]
+            row, col = divmod(current, cols)
+            for bit, step, inside in ((DOWN, cols, row + 1 < row1), (UP, -cols, row > row0),
+                                      (RIGHT, 1, col + 1 < col1), (LEFT, -1, col > col0)):
+                if bits & bit and inside:
+                    neighbor = current + step
+                    if neighbor not in settled:
+                        settled[neighbor] = d
+                        came_from[neighbor] = current
+                        next_frontier.append(neighbor)
+                        if neighbor in targets:
+                            left -= 1
+        frontier = next_frontier
+    return settled, came_from
+
+
+def _entrances(plane, rows, cols, cluster):
+    # Yields (a, b) cell pairs across every opening between two blocks.
+    def runs(pairs):
+        run = []
+        for a, b in pairs:
+            if plane[a] != WALL and plane[b] != WALL:
+                run.append((a, b))
+                continue
+            yield from _doors(run)
+            run = []
+        yield from _doors(run)
+
+    for row in range(cluster - 1, rows - 1, cluster):
+        for col0 in range(0, cols, cluster):
+            yield from runs((row * cols + col, (row + 1) * cols + col)
+                            for col in range(col0, min(cols, col0 + cluster)))
+    for col in range(cluster - 1, cols - 1, cluster):
+        for row0 in range(0, rows, cluster):
+            yield from runs((row * cols + col, row * cols + col + 1)
+                            for row in range(row0, min(rows, row0 + cluster)))
+
+
+def _doors(run):
+    if len(run) >= LONG_ENTRANCE:
+        return [run[0], run[-1]]
+    return [run[len(run) // 2]] if run else []
+
+
+def build(maze, cluster=CLUSTER):
+    rows, cols, costs = maze.rows, maze.cols, maze.costs
+    mask = passability(maze.plane, rows, cols)
+    cluster_rows = -(-rows // cluster)
+    cluster_cols = -(-cols // cluster)
+    edges = {}
+    for a, b in _entrances(maze.plane, rows, cols, cluster):
+        edges.setdefault(a, {})[b] = _step_cost(costs, b)
+        edges.setdefault(b, {})[a] = _step_cost(costs, a)
+
+    def cluster_of(i):
+        row, col = divmod(i, cols)
+        return (row // cluster) * cluster_cols + col // cluster
+
+    nodes = array("i", sorted(edges, key=lambda i: (cluster_of(i), i)))
+    cluster_first = array("i", [0]) * (cluster_rows * cluster_cols + 1)
+    for i in nodes:
+        cluster_first[cluster_of(i) + 1] += 1
+    for b in range(cluster_rows * cluster_cols):
+        cluster_first[b + 1] += cluster_first[b]
+
+    graph = AbstractGraph(rows, cols, cluster, cluster_first, nodes, None, None, None)
+    for b in range(cluster_rows * cluster_cols):
+        members = graph.cluster_nodes(b)
+        box = graph.box(b)
+        targets = set(members)
+        for source in members:
+            settled, _ = _local(mask, costs, cols, box, source, targets - {source})
+            for target in members:
+                if target != source and target in settled:
+                    edges[source][target] = settled[target]
+
+    edge_first = array("i", [0])
+    edge_to = array("i")
+    edge_cost = array("i")
+    for i in nodes:
+        for target, cost in edges[i].items():
+            edge_to.append(graph.node_of[target])
+            edge_cost.append(cost)
+        edge_first.append(len(edge_to))
+    graph.edge_first, graph.edge_to, graph.edge_cost = edge_first, edge_to, edge_cost
+    return graph
+
+
+def dumps(graph):
+    header = HEADER.pack(MAGIC, VERSION, 0, graph.cluster, graph.rows, graph.cols,
+                         len(graph.nodes), len(graph.edge_to))
+    return b"".join((header, graph.cluster_first.tobytes(), graph.nodes.tobytes(),
+                     graph.edge_first.tobytes(), graph.edge_to.tobytes(), graph.edge_cost.tobytes()))
+
+
+def parse(buffer):
+    if len(buffer) < HEADER.size:
+        raise MazeFormatError("file too short for an abstract graph header")
+    magic, version, _, cluster, rows, cols, n_nodes, n_edges = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION:
+        raise MazeFormatError("not an abstract graph file")
+    n_clusters = -(-rows // cluster) * -(-cols // cluster)
+    lengths = (n_clusters + 1, n_nodes, n_nodes + 1, n_edges, n_edges)
+    itemsize = array("i").itemsize
+    if len(buffer) < HEADER.size + sum(lengths) * itemsize:
+        raise MazeFormatError("abstract graph is truncated")
+    arrays = []
+    offset = HEADER.size
+    for length in lengths:
+        values = array("i")
+        values.frombytes(buffer[offset:offset + length * itemsize])
+        arrays.append(values)
+        offset += length * itemsize
+    return AbstractGraph(rows, cols, cluster, *arrays)
+
+
+def query(graph, maze, start, end):
+    # Returns (waypoints, cost, expanded): the start, the nodes the path
+    # passes through and the end, or ([], None, expanded) with no path.
+    rows, cols, costs = maze.rows, maze.cols, maze.costs
+    if maze.plane[start] == WALL or maze.plane[end] == WALL:
+        return [], None, 0
+    if start == end:
+        return [start], 0, 0
+    n = len(graph.nodes)
+    source, goal = n, n + 1
+    cells = {source: start, goal: end}
+    mask = _QueryMask(maze.plane, rows, cols)
+
+    # Edges out of the start and into the goal, found inside their blocks.
+    start_block, end_block = graph.cluster_of(start), graph.cluster_of(end)
+    targets = set(graph.cluster_nodes(start_block))
+    if start_block == end_block:
+        targets.add(end)
+    settled, _ = _local(mask, costs, cols, graph.box(start_block), start, targets)
+    start_edges = [(graph.node_of[i], d) for i, d in settled.items() if i in graph.node_of and i != end]
+    if end in settled:
+        start_edges.append((goal, settled[end]))
+    # Searching out from the goal prices each step by the cell it leaves,
+    # so the node's own cost is swapped for the goal's.
+    settled, _ = _local(mask, costs, cols, graph.box(end_block), end, set(graph.cluster_nodes(end_block)))
+    into_goal = {graph.node_of[i]: d - _step_cost(costs, i) + _step_cost(costs, end)
+                 for i, d in settled.items() if i in graph.node_of}
+
+    low = 1 if costs is None else max(1, min(costs))
+    end_row, end_col = divmod(end, cols)
+    nodes, edge_first, edge_to, edge_cost = graph.nodes, graph.edge_first, graph.edge_to, graph.edge_cost
+    g = {source: 0}
+    came_from = {source: -1}
+    closed = set()
+    heap = [(0, 0, source)]
+    expanded = 0
+    while heap:
+        # Ties on f go to the deeper entry, which is pushed with -g.
+        _, d, k = heapq.heappop(heap)
+        d = -d
+        if k in closed:
+            continue
+        closed.add(k)
+        expanded += 1
+        if k == goal:
+            waypoints = []
+            while k != -1:
+                waypoints.append(cells[k] if k >= n else nodes[k])
+                k = came_from[k]
+            waypoints.reverse()
+            return waypoints, d, expanded
+        if k == source:
+            out = start_edges
+        else:
+            out = zip(edge_to[edge_first[k]:edge_first[k + 1]], edge_cost[edge_first[k]:edge_first[k + 1]])
+            if k in into_goal:
+                out = list(out) + [(goal, into_goal[k])]
+        for neighbor, cost in out:
+            cost += d
+            old = g.get(neighbor)
+            if neighbor not in closed and (old is None or cost < old):
+                g[neighbor] = cost
+                came_from[neighbor] = k
+                row, col = divmod(cells[goal] if neighbor == goal else nodes[neighbor], cols)
+                heapq.heappush(heap, (cost + (abs(row - end_row) + abs(col - end_col)) * low, -cost, neighbor))
+    return [], None, expanded
+
+
+def refine(graph, maze, waypoints):
+    # Yields every cell along the waypoints. Consecutive waypoints are either
+    # one step apart or in the same block, which is then searched alone, so
+    # taking only the first few cells only refines the first block.
+    if not waypoints:
+        return
+    mask = _QueryMask(maze.plane, maze.rows, maze.cols)
+    yield waypoints[0]
+    for a, b in zip(waypoints, waypoints[1:]):
+        block = graph.cluster_of(a)
+        if block != graph.cluster_of(b):
+            yield b
+            continue
+        _, came_from = _local(mask, maze.costs, maze.cols, graph.box(block), a, {b})
+        leg = []
+        while b != a:
+            leg.append(b)
+            b = came_from[b]
+        yield from reversed(leg)
+
+
+def hpa(graph, maze, start, end):
+    started = time.perf_counter()
+    waypoints, cost, expanded = query(graph, maze, start, end)
+    return SolveResult(list(refine(graph, maze, waypoints)), cost, expanded, time.perf_counter() - started)
+
+
+class _QueryMask:
+    # Passability looked up cell by cell, so a query does not pay for a
+    # mask of the whole maze.
+
+    def __init__(self, plane, rows, cols):
+        self.plane = plane
+        self.rows = rows
+        self.cols = cols
+
+    def __getitem__(self, i):
+        plane, cols = self.plane, self.cols
+        row, col = divmod(i, cols)
+        bits = 0
+        if row < self.rows - 1 and plane[i + cols] != WALL:
+            bits |= DOWN
+        if row > 0 and plane[i - cols] != WALL:
+            bits |= UP
+        if col < cols - 1 and plane[i + 1] != WALL:
+            bits |= RIGHT
+        if col > 0 and plane[i - 1] != WALL:
+            bits |= LEFT
+        return bits
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the HPA* graph of a maze and time queries on it.")
+    parser.add_argument("maze", help=".maze file")
+    parser.add_argument("-c", "--cluster", type=int, default=CLUSTER, help="block size in cells")
+    parser.add_argument("-q", "--queries", type=int, default=100, help="random start/end pairs to time")
+    parser.add_argument("--check", type=int, default=10, help="queries also solved exactly to compare costs")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    maze = mazefile.load(args.maze)
+    t0 = time.perf_counter()
+    graph = build(maze, args.cluster)
+    built = time.perf_counter() - t0
+    print(f"{maze.rows}x{maze.cols}: {len(graph.nodes):,} nodes, {len(graph.edge_to):,} edges "
+          f"in {built:.2f} s")
+
+    rng = random.Random(args.seed)
+    plane = bytes(maze.plane)
+    free = [i for i in range(len(plane)) if plane[i] != WALL]
+    queried = refined = 0.0
+    worst = 1.0
+    for k in range(args.queries):
+        start, end = rng.choice(free), rng.choice(free)
+        t0 = time.perf_counter()
+        waypoints, cost, _ = query(graph, maze, start, end)
+        t1 = time.perf_counter()
+        list(refine(graph, maze, waypoints))
+        queried += t1 - t0
+        refined += time.perf_counter() - t1
+        if k < args.check and cost:
+            exact = solve("dial", maze.plane, maze.rows, maze.cols, start, end, costs=maze.costs).cost
+            worst = max(worst, cost / exact)
+    if args.queries:
+        print(f"query {queried / args.queries * 1000:.3f} ms, refine {refined / args.queries * 1000:.3f} ms, "
+              f"worst cost ratio {worst:.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
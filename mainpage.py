@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import ttk
-import subprocess
+
+import pygame
+
+import developermode
+import TEST6FORMINUE
+from mazestore import MazeStore
+from solutioncache import SolutionCache
+
+# Both modes run inside this process and share one maze store and solution
+# cache, so only the first launch pays for starting pygame and loading.
+STORE = MazeStore()
+CACHE = SolutionCache()
+
+
+def launch(scene):
+    root.withdraw()
+    try:
+        scene()
+    finally:
+        pygame.display.quit()
+        root.deiconify()
 
 def run_developer_mode():
-    subprocess.Popen(["python", "developermode.py"])
+    launch(lambda: developermode.main(developermode.open_window(), store=STORE, cache=CACHE))
 
 def run_1_vs_1():
-    subprocess.Popen(["python", "TEST6FORMINUE.py"])
+    launch(lambda: TEST6FORMINUE.main(TEST6FORMINUE.open_window(), TEST6FORMINUE.WIDTH, STORE, CACHE))
 
 
 root = tk.Tk()
@@ -0,0 +1,111 @@
+import argparse
+import json
+import sys
+from collections import namedtuple
+
+from batchsolve import iter_mazes
+from mazestore import MazeStore
+from solver import WALL, distance_field, passability
+
+Report = namedtuple("Report", [
+    "rows", "cols", "has_start", "has_end", "solvable", "path_length", "free_cells",
+    "unreachable", "dead_ends", "junctions", "branching", "wall_density", "problems",
+])
+
+# Number of open directions for every passability mask value.
+_DEGREE = bytes(bin(bits).count("1") for bits in range(256))
+_FREE_ONLY = bytes(0 if state == WALL else 0xFF for state in range(256))
+_ZERO_ONLY = bytes(0xFF if cost == 0 else 0 for cost in range(256))
+
+
+def check(maze):
+    # Everything except the reachability flood is counted over whole planes
+    # with translate(), count() and sum() rather than a loop per cell.
+    n = maze.rows * maze.cols
+    plane = bytes(maze.plane)
+    walls = plane.count(WALL)
+    free = n - walls
+    # The mask says where a cell could step to, so walls are masked out
+    # before the directions are counted.
+    free_only = int.from_bytes(plane.translate(_FREE_ONLY), "little")
+    mask = int.from_bytes(passability(plane, maze.rows, maze.cols), "little") & free_only
+    degree = mask.to_bytes(n, "little").translate(_DEGREE)
+    dead_ends = degree.count(1)
+    junctions = degree.count(3) + degree.count(4)
+
+    problems = []
+    has_start = maze.start is not None
+    has_end = maze.end is not None
+    if not has_start:
+        problems.append("no start")
+    elif plane[maze.start] == WALL:
+        problems.append("start is a wall")
+    if not has_end:
+        problems.append("no end")
+    elif plane[maze.end] == WALL:
+        problems.append("end is a wall")
+    if maze.costs is not None:
+        # Free cells must cost at least 1, what walls hold does not matter.
+        zero = int.from_bytes(bytes(maze.costs).translate(_ZERO_ONLY), "little") & free_only
+        if zero:
+            problems.append("free cells with no terrain cost")
+
+    path_length = None
+    unreachable = free
+    if not problems:
+        dist = distance_field(plane, maze.rows, maze.cols, maze.start)
+        unreachable = free - (n - dist.count(-1))
+        if dist[maze.end] == -1:
+            problems.append("no path from start to end")
+        else:
+            path_length = dist[maze.end]
+
+    return Report(
+        maze.rows, maze.cols, has_start, has_end, path_length is not None, path_length, free,
+        unreachable, dead_ends, junctions, sum(degree) / free if free else 0.0,
+        walls / n if n else 0.0, problems,
+    )
+
+
+def unreadable(error):
+    return Report(None, None, False, False, False, None, 0, 0, 0, 0, 0.0, 0.0, [f"unreadable: {error}"])
+
+
+def check_store(store, quarantine=False):
+    for maze_id in store.ids():
+        try:
+            report = check(store.load(maze_id))
+        except (ValueError, OSError) as error:
+            report = unreadable(error)
+        if quarantine and report.problems:
+            store.quarantine(maze_id, report.problems)
+        yield maze_id, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate mazes and report their statistics.")
+    parser.add_argument("source", nargs="?", help="directory, archive or .maze file, the maze store by default")
+    parser.add_argument("-q", "--quarantine", action="store_true",
+                        help="move failing mazes out of the store so matches never pick them")
+    args = parser.parse_args(argv)
+
+    if args.source is None:
+        reports = check_store(MazeStore(), args.quarantine)
+    elif args.quarantine:
+        parser.error("--quarantine only works on the maze store")
+    else:
+        reports = ((name, unreadable(error) if error else check(maze))
+                   for name, maze, error in iter_mazes(args.source))
+
+    bad = 0
+    for name, report in reports:
+        bad += bool(report.problems)
+        row = dict(report._asdict(), name=name)
+        row["branching"] = round(row["branching"], 4)
+        row["wall_density"] = round(row["wall_density"], 4)
+        print(json.dumps(row))
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+
+from solver import WALL
+
+# Layout (little endian):
+#   magic "AMZE", version u8, flags u8, reserved u16,
+#   rows u32, cols u32, start u32, end u32,
+#   then rows * cols bytes, one FREE/WALL byte per cell, row-major,
+#   then with the COSTS flag another rows * cols bytes of terrain costs.
+MAGIC = b"AMZE"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHIIII")
+NO_CELL = 0xFFFFFFFF
+COSTS = 1  # flag: a terrain cost plane follows the wall plane
+
+WALL_COLOR = [0, 0, 0]
+START_COLOR = [255, 165, 0]
+END_COLOR = [64, 224, 208]
+
+# costs is None for mazes where every step costs 1.
+Maze = namedtuple("Maze", ["rows", "cols", "start", "end", "plane", "costs"], defaults=(None,))
+
+
+class MazeFormatError(ValueError):
+    pass
+
+
+def _cell(value):
+    return None if value == NO_CELL else value
+
+
+def parse(buffer):
+    if len(buffer) < HEADER.size:
+        raise MazeFormatError("file too short for a maze header")
+    magic, version, flags, _, rows, cols, start, end = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise MazeFormatError("not a maze file")
+    if version != VERSION:
+        raise MazeFormatError(f"unsupported maze version {version}")
+    if flags & ~COSTS:
+        raise MazeFormatError(f"unsupported maze flags {flags:#x}")
+    n = rows * cols
+    for name, cell in (("start", start), ("end", end)):
+        if cell != NO_CELL and cell >= n:
+            raise MazeFormatError(f"{name} cell {cell} is outside the {rows}x{cols} grid")
+    if len(buffer) < HEADER.size + n:
+        raise MazeFormatError("wall plane is truncated")
+    plane = memoryview(buffer)[HEADER.size:HEADER.size + n]
+    costs = None
+    if flags & COSTS:
+        if len(buffer) < HEADER.size + 2 * n:
+            raise MazeFormatError("cost plane is truncated")
+        costs = memoryview(buffer)[HEADER.size + n:HEADER.size + 2 * n]
+    return Maze(rows, cols, _cell(start), _cell(end), plane, costs)
+
+
+def load(file_name):
+    # The planes are read-only views straight into the mapped file.
+    with open(file_name, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise MazeFormatError("empty file")
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return parse(mapped)
+
+
+def dumps(maze):
+    header = HEADER.pack(
+        MAGIC, VERSION, 0 if maze.costs is None else COSTS, 0, maze.rows, maze.cols,
+        NO_CELL if maze.start is None else maze.start,
+        NO_CELL if maze.end is None else maze.end,
+    )
+    if maze.costs is None:
+        return header + bytes(maze.plane)
+    return header + bytes(maze.plane) + bytes(maze.costs)
+
+
+def save(file_name, maze):
+    with open(file_name, "wb") as file:
+        file.write(dumps(maze))
+
+
+def from_json(maze_data):
+    rows = max(row for row, _, _ in maze_data) + 1
+    cols = max(col for _, col, _ in maze_data) + 1
+    plane = bytearray(rows * cols)
+    seen = bytearray(rows * cols)
+    start = None
+    end = None
+    for row, col, color in maze_data:
+        i = row * cols + col
+        # make_grid() keeps the first copy of a cell, so do the same here
+        if seen[i]:
+            continue
+        seen[i] = 1
+        color = list(color)
+        if color == WALL_COLOR:
+            plane[i] = WALL
+        elif color == START_COLOR:
+            start = i
+        elif color == END_COLOR:
+            end = i
+    return Maze(rows, cols, start, end, plane)
+
+
+def from_spots(spots, rows, cols):
+    plane = bytearray(rows * cols)
+    start = None
+    end = None
+    for spot in spots:
+        i = spot.row * cols + spot.col
+        if spot.is_barrier():
+            plane[i] = WALL
+        elif spot.is_start():
+            start = i
+        elif spot.is_end():
+            end = i
+    return Maze(rows, cols, start, end, plane)
+
+
+def convert(json_name, maze_name=None):
+    if maze_name is None:
+        maze_name = os.path.splitext(json_name)[0] + ".maze"
+    with open(json_name, "r") as file:
+        maze = from_json(json.load(file))
+    save(maze_name, maze)
+    return maze_name
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:]:
+        print(name, "->", convert(name))
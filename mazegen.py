@@ -0,0 +1,207 @@
+import argparse
+import random
+import time
+from array import array
+
+import mazefile
+from mazefile import Maze
+from mazestore import MazeStore
+from solver import FREE, WALL, distance_field
+
+# Perfect mazes carve rooms on even (row, col) positions and knock out the
+# wall cell between two rooms. Every room ends up connected to every other,
+# so any start and end room pair is solvable.
+
+
+def _rooms(rows, cols):
+    return [row * cols + col for row in range(0, rows, 2) for col in range(0, cols, 2)]
+
+
+def _room_steps(rows, cols, i):
+    # (wall between, next room) pairs around room i.
+    row, col = divmod(i, cols)
+    if row >= 2:
+        yield i - cols, i - 2 * cols
+    if row + 2 < rows:
+        yield i + cols, i + 2 * cols
+    if col >= 2:
+        yield i - 1, i - 2
+    if col + 2 < cols:
+        yield i + 1, i + 2
+
+
+def backtracker(rows, cols, rng):
+    plane = bytearray([WALL]) * (rows * cols)
+    plane[0] = FREE
+    stack = [0]
+    while stack:
+        current = stack[-1]
+        options = [step for step in _room_steps(rows, cols, current) if plane[step[1]] == WALL]
+        if not options:
+            stack.pop()
+            continue
+        wall, room = options[rng.randrange(len(options))]
+        plane[wall] = plane[room] = FREE
+        stack.append(room)
+    return plane
+
+
+def prim(rows, cols, rng):
+    plane = bytearray([WALL]) * (rows * cols)
+    plane[0] = FREE
+    frontier = list(_room_steps(rows, cols, 0))
+    while frontier:
+        # Swap the picked entry to the end so removal is O(1).
+        k = rng.randrange(len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        wall, room = frontier.pop()
+        if plane[room] == FREE:
+            continue
+        plane[wall] = plane[room] = FREE
+        frontier.extend(step for step in _room_steps(rows, cols, room) if plane[step[1]] == WALL)
+    return plane
+
+
+def kruskal(rows, cols, rng):
+    plane = bytearray([WALL]) * (rows * cols)
+    parent = array("i", range(rows * cols))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    edges = []
+    for i in _rooms(rows, cols):
+        plane[i] = FREE
+        row, col = divmod(i, cols)
+        if row + 2 < rows:
+            edges.append((i, i + cols, i + 2 * cols))
+        if col + 2 < cols:
+            edges.append((i, i + 1, i + 2))
+    rng.shuffle(edges)
+    for a, wall, b in edges:
+        a, b = find(a), find(b)
+        if a != b:
+            parent[a] = b
+            plane[wall] = FREE
+    return plane
+
+
+def wilson(rows, cols, rng):
+    # Loop-erased random walks give a uniformly random spanning tree.
+    plane = bytearray([WALL]) * (rows * cols)
+    rooms = _rooms(rows, cols)
+    in_maze = bytearray(rows * cols)
+    in_maze[rooms[rng.randrange(len(rooms))]] = 1
+    heading = {}
+    for start in rooms:
+        if in_maze[start]:
+            continue
+        current = start
+        while not in_maze[current]:
+            steps = list(_room_steps(rows, cols, current))
+            heading[current] = steps[rng.randrange(len(steps))]
+            current = heading[current][1]
+        current = start
+        while not in_maze[current]:
+            wall, room = heading[current]
+            in_maze[current] = 1
+            plane[current] = plane[wall] = FREE
+            current = room
+    for i in rooms:
+        plane[i] = FREE
+    return plane
+
+
+def caves(rows, cols, rng, density=0.45, passes=4):
+    # Cellular automaton: random noise smoothed by the 4-5 rule, where a
+    # cell becomes wall when five or more of its eight neighbours are.
+    # The plane is padded with a wall border so no bounds checks are needed.
+    width = cols + 2
+    padded = bytearray([WALL]) * ((rows + 2) * width)
+    for row in range(rows):
+        base = (row + 1) * width + 1
+        padded[base:base + cols] = bytes(WALL if rng.random() < density else FREE for _ in range(cols))
+    offsets = [dr * width + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)]
+    for _ in range(passes):
+        smoothed = bytearray(padded)
+        for row in range(rows):
+            base = (row + 1) * width + 1
+            for i in range(base, base + cols):
+                smoothed[i] = WALL if sum(padded[i + k] for k in offsets) >= 5 else FREE
+        padded = smoothed
+    plane = bytearray()
+    for row in range(rows):
+        base = (row + 1) * width + 1
+        plane += padded[base:base + cols]
+    return plane
+
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+    "kruskal": kruskal,
+    "wilson": wilson,
+    "caves": caves,
+}
+
+
+def _keep_reachable(plane, rows, cols, start):
+    # Walls off every pocket the start cannot reach and returns the
+    # farthest reachable cell, which makes the longest possible goal.
+    dist = distance_field(plane, rows, cols, start)
+    end, best = start, 0
+    for i, d in enumerate(dist):
+        if d == -1:
+            plane[i] = WALL
+        elif d > best:
+            end, best = i, d
+    return end
+
+
+def generate(name, rows, cols, seed=None):
+    rng = random.Random(seed)
+    plane = GENERATORS[name](rows, cols, rng)
+    if name == "caves":
+        free = [i for i in range(rows * cols) if plane[i] == FREE]
+        start = free[rng.randrange(len(free))] if free else 0
+        plane[start] = FREE
+        end = _keep_reachable(plane, rows, cols, start)
+    else:
+        start = 0
+        end = (rows - 1) // 2 * 2 * cols + (cols - 1) // 2 * 2
+    return Maze(rows, cols, start, end, plane)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate random solvable mazes.")
+    parser.add_argument("-a", "--algorithm", default="backtracker", choices=sorted(GENERATORS))
+    parser.add_argument("-s", "--size", type=int, nargs=2, default=[21, 21], metavar=("ROWS", "COLS"))
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--save", action="store_true", help="add the mazes to the maze store")
+    parser.add_argument("-o", "--output", help="write a single maze to this .maze file")
+    args = parser.parse_args(argv)
+
+    rows, cols = args.size
+    store = MazeStore() if args.save else None
+    total = 0.0
+    for k in range(args.count):
+        seed = None if args.seed is None else args.seed + k
+        t0 = time.perf_counter()
+        maze = generate(args.algorithm, rows, cols, seed)
+        total += time.perf_counter() - t0
+        if store is not None:
+            print("saved maze", store.save(maze))
+        if args.output:
+            mazefile.save(args.output, maze)
+
+    cells = rows * cols * args.count
+    print(f"{args.algorithm}: {args.count} x {rows}x{cols} in {total * 1000:.1f} ms, "
+          f"{cells / total if total else 0:,.0f} cells/s")
+
+
+if __name__ == "__main__":
+    main()
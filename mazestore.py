@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+
+import mazefile
+
+MAZE_DIR = "mazes"
+INDEX_FILE = "index.json"
+QUARANTINE_DIR = "quarantine"
+
+
+def checksum(maze):
+    return hashlib.sha1(mazefile.dumps(maze)).hexdigest()
+
+
+def atomic_write(file_name, data):
+    # Write next to the target and rename over it, so readers only ever
+    # see the old file or the complete new one.
+    directory = os.path.dirname(file_name) or "."
+    fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_name, file_name)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+class MazeStore:
+    def __init__(self, root=MAZE_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        try:
+            with open(self._path(INDEX_FILE), "r") as file:
+                self.records = {int(k): v for k, v in json.load(file).items()}
+        except FileNotFoundError:
+            self.records = {}
+        self._ids = sorted(self.records)
+        self._by_checksum = {r["checksum"]: i for i, r in self.records.items()}
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _write_index(self):
+        data = json.dumps({str(i): r for i, r in sorted(self.records.items())}, indent=1)
+        atomic_write(self._path(INDEX_FILE), data.encode())
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, maze_id):
+        return maze_id in self.records
+
+    def ids(self):
+        return list(self._ids)
+
+    def by_size(self, rows, cols):
+        return [i for i in self._ids if self.records[i]["rows"] == rows and self.records[i]["cols"] == cols]
+
+    def by_checksum(self, digest):
+        return self._by_checksum.get(digest)
+
+    def load(self, maze_id):
+        return mazefile.load(self._path(self.records[maze_id]["file"]))
+
+    def save(self, maze, maze_id=None):
+        digest = checksum(maze)
+        existing = self._by_checksum.get(digest)
+        if existing is not None and maze_id in (None, existing):
+            return existing
+
+        if maze_id is None:
+            maze_id = self._ids[-1] + 1 if self._ids else 1
+        elif maze_id in self.records:
+            del self._by_checksum[self.records[maze_id]["checksum"]]
+
+        name = f"{maze_id}.maze"
+        atomic_write(self._path(name), mazefile.dumps(maze))
+        if maze_id not in self.records:
+            self._ids.append(maze_id)
+            self._ids.sort()
+        self.records[maze_id] = {"file": name, "rows": maze.rows, "cols": maze.cols, "checksum": digest}
+        self._by_checksum[digest] = maze_id
+        self._write_index()
+        return maze_id
+
+    def quarantine(self, maze_id, problems):
+        # Moves a maze out of play, keeping its file and what was wrong
+        # with it in the quarantine folder for a later look.
+        record = self.records.pop(maze_id)
+        self._ids.remove(maze_id)
+        del self._by_checksum[record["checksum"]]
+        directory = self._path(QUARANTINE_DIR)
+        os.makedirs(directory, exist_ok=True)
+        index_name = os.path.join(directory, INDEX_FILE)
+        try:
+            with open(index_name, "r") as file:
+                quarantined = json.load(file)
+        except FileNotFoundError:
+            quarantined = {}
+        # Ids get reused, so quarantined files are named by checksum.
+        name = record["checksum"] + ".maze"
+        quarantined[record["checksum"]] = dict(record, id=maze_id, file=name, problems=problems)
+        if os.path.exists(self._path(record["file"])):
+            os.replace(self._path(record["file"]), os.path.join(directory, name))
+        atomic_write(index_name, json.dumps(quarantined, indent=1).encode())
+        self._write_index()
+
+    def random_id(self, rng=random):
+        # None when there is nothing left to play.
+        if not self._ids:
+            return None
+        return self._ids[rng.randrange(len(self._ids))]
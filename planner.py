@@ -0,0 +1,125 @@
+import heapq
+from array import array
+
+from solver import DOWN, LEFT, RIGHT, UP, WALL, moves
+
+INF = 1 << 30
+
+
+class LPAStar:
+    # Lifelong Planning A* over a live plane. After cells change between
+    # wall and free, update() them and call compute(): only the part of the
+    # search that depended on those cells is repaired. Any state other than
+    # WALL counts as free, so a state plane can be planned over directly.
+    # With a cost plane, stepping onto a cell costs costs[cell] instead of 1;
+    # repainted terrain is passed to update() like walls are.
+
+    def __init__(self, plane, rows, cols, start, end, costs=None):
+        n = rows * cols
+        self.plane = plane
+        self.costs = costs
+        self.rows = rows
+        self.cols = cols
+        self.start = start
+        self.end = end
+        self.end_row, self.end_col = divmod(end, cols)
+        self.steps = ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+        self.g = array("i", [INF]) * n
+        self.rhs = array("i", [INF]) * n
+        # Heap entries are lazily deleted: one is live only while its key
+        # matches the key recorded for the cell in queued.
+        self.queued = {}
+        self.heap = []
+        self.expanded = 0
+        self.rhs[start] = 0
+        self._push(start)
+
+    def _h(self, i):
+        row, col = divmod(i, self.cols)
+        return abs(row - self.end_row) + abs(col - self.end_col)
+
+    def _key(self, i):
+        best = min(self.g[i], self.rhs[i])
+        return best + self._h(i), best
+
+    def _push(self, i):
+        key = self._key(i)
+        self.queued[i] = key
+        heapq.heappush(self.heap, (key, i))
+
+    def _neighbors(self, i):
+        bits = moves(self.plane, self.rows, self.cols, i)
+        for bit, step in self.steps:
+            if bits & bit:
+                yield i + step
+
+    def _top(self):
+        heap = self.heap
+        while heap and self.queued.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else (INF, INF)
+
+    def _update_vertex(self, i):
+        if i != self.start:
+            best = INF
+            if self.plane[i] != WALL:
+                g = self.g
+                for neighbor in self._neighbors(i):
+                    if g[neighbor] < best:
+                        best = g[neighbor]
+                if best != INF:
+                    best += 1 if self.costs is None else self.costs[i]
+            self.rhs[i] = best
+        self.queued.pop(i, None)
+        if self.g[i] != self.rhs[i]:
+            self._push(i)
+
+    def update(self, i):
+        # Call after cell i turned into a wall, back into free space or
+        # changed its cost.
+        self._update_vertex(i)
+        for neighbor in self._neighbors(i):
+            self._update_vertex(neighbor)
+
+    def settled(self):
+        return not self.heap or (self._top() >= self._key(self.end) and self.rhs[self.end] == self.g[self.end])
+
+    def compute(self, budget=None):
+        # Repairs the search, stopping early after budget expansions so a
+        # big edit can be spread over several frames. Returns how many
+        # cells were expanded; settled() tells whether the path is final.
+        g, rhs, end = self.g, self.rhs, self.end
+        expanded = 0
+        while self._top() < self._key(end) or rhs[end] != g[end]:
+            if not self.heap or expanded == budget:
+                break
+            _, current = heapq.heappop(self.heap)
+            del self.queued[current]
+            expanded += 1
+            if g[current] > rhs[current]:
+                g[current] = rhs[current]
+                for neighbor in self._neighbors(current):
+                    self._update_vertex(neighbor)
+            else:
+                g[current] = INF
+                self._update_vertex(current)
+                for neighbor in self._neighbors(current):
+                    self._update_vertex(neighbor)
+        self.expanded += expanded
+        return expanded
+
+    def cost(self):
+        return None if self.g[self.end] >= INF else self.g[self.end]
+
+    def path(self):
+        # Walks back from the end, always to the neighbour closest to the start.
+        if self.cost() is None:
+            return []
+        g = self.g
+        current = self.end
+        path = [current]
+        while current != self.start:
+            current = min(self._neighbors(current), key=g.__getitem__)
+            path.append(current)
+        path.reverse()
+        return path
@@ -0,0 +1,218 @@
+import pygame
+
+from cellstate import PALETTE, TERRAIN_PALETTE
+from solver import FREE
+
+WHITE = (255, 255, 255)
+GREY = (128, 128, 128)
+HIGHLIGHT = (255, 0, 0)
+MIN_CELL = 4
+MAX_CELL = 64
+GRID_LINES_FROM = 8
+MAX_RECTS = 256
+
+
+class GridRenderer:
+    # The background surface holds the visible part of the board as of the
+    # last flush. Changed cells are repainted onto it and only their rects
+    # are copied to the window and pushed to the display. The viewport is
+    # measured in cells: rows run along x and cols along y, like Spot.
+
+    def __init__(self, win):
+        self.win = win
+        self.plane = None
+        self.costs = None
+        self.rows = 0
+        self.cols = 0
+        self.cell = MIN_CELL
+        self.left = 0
+        self.top = 0
+        self.background = None
+        self.dirty = set()
+        self.spans = []
+        self.current = None
+        self.full = True
+
+    def fit_cell(self):
+        width, height = self.win.get_size()
+        return max(MIN_CELL, min(MAX_CELL, width // self.rows, height // self.cols))
+
+    def visible(self):
+        width, height = self.win.get_size()
+        return -(-width // self.cell), -(-height // self.cell)
+
+    def set_plane(self, plane, rows, cols, costs=None):
+        self.plane = plane
+        self.costs = costs
+        self.rows = rows
+        self.cols = cols
+        self.cell = self.fit_cell()
+        self.left = 0
+        self.top = 0
+        self.current = None
+        self.rebuild()
+
+    def mark(self, i):
+        self.dirty.add(i)
+
+    def mark_span(self, row, col0, col1):
+        # Cells col0 up to col1 of one row, repainted together on flush.
+        self.spans.append((row, col0, col1))
+
+    def invalidate(self):
+        self.full = True
+
+    def rect(self, i):
+        row, col = divmod(i, self.cols)
+        x = (row - self.left) * self.cell
+        y = (col - self.top) * self.cell
+        width, height = self.win.get_size()
+        if x < 0 or y < 0 or x >= width or y >= height:
+            return None
+        return pygame.Rect(x, y, self.cell, self.cell)
+
+    def cell_at(self, pos):
+        x, y = pos
+        row = self.left + x // self.cell
+        col = self.top + y // self.cell
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row * self.cols + col
+        return None
+
+    def _paint(self, i):
+        rect = self.rect(i)
+        if rect is None:
+            return None
+        state = self.plane[i]
+        color = PALETTE[state]
+        if state == FREE and self.costs is not None:
+            color = TERRAIN_PALETTE.get(self.costs[i], color)
+        self.background.fill(color, rect)
+        if self.cell >= GRID_LINES_FROM:
+            x, y = rect.topleft
+            pygame.draw.line(self.background, GREY, (x, y), (x + self.cell, y))
+            pygame.draw.line(self.background, GREY, (x, y), (x, y + self.cell))
+        return rect
+
+    def _paint_span(self, span):
+        row, col0, col1 = span
+        seen_rows, seen_cols = self.visible()
+        col0 = max(col0, self.top)
+        col1 = min(col1, self.top + seen_cols)
+        if not self.left <= row < self.left + seen_rows or col0 >= col1:
+            return None
+        self._paint_area(range(row, row + 1), range(col0, col1))
+        return pygame.Rect((row - self.left) * self.cell, (col0 - self.top) * self.cell,
+                           self.cell, (col1 - col0) * self.cell)
+
+    def _paint_area(self, rows, cols):
+        for row in rows:
+            base = row * self.cols
+            for col in cols:
+                self._paint(base + col)
+
+    def rebuild(self):
+        self.background = pygame.Surface(self.win.get_size())
+        self.background.fill(WHITE)
+        seen_rows, seen_cols = self.visible()
+        self._paint_area(range(self.left, min(self.rows, self.left + seen_rows)),
+                         range(self.top, min(self.cols, self.top + seen_cols)))
+        self.dirty.clear()
+        self.spans.clear()
+        self.full = True
+
+    def scroll_to(self, left, top):
+        seen_rows, seen_cols = self.visible()
+        left = max(0, min(left, self.rows - seen_rows))
+        top = max(0, min(top, self.cols - seen_cols))
+        dx, dy = left - self.left, top - self.top
+        if not dx and not dy:
+            return
+        if abs(dx) >= seen_rows or abs(dy) >= seen_cols:
+            self.left, self.top = left, top
+            self.rebuild()
+            return
+
+        # Shift what is already drawn and only paint the exposed strips.
+        self.background.scroll(-dx * self.cell, -dy * self.cell)
+        self.left, self.top = left, top
+        rows = range(self.left, min(self.rows, self.left + seen_rows))
+        cols = range(self.top, min(self.cols, self.top + seen_cols))
+        if dx > 0:
+            self._paint_area(rows[-dx - 1:], cols)
+        elif dx < 0:
+            self._paint_area(rows[:-dx], cols)
+        if dy > 0:
+            self._paint_area(rows, cols[-dy - 1:])
+        elif dy < 0:
+            self._paint_area(rows, cols[:-dy])
+        self.full = True
+
+    def scroll(self, drows, dcols):
+        self.scroll_to(self.left + drows, self.top + dcols)
+
+    def follow(self, i):
+        row, col = divmod(i, self.cols)
+        seen_rows, seen_cols = self.visible()
+        left, top = self.left, self.top
+        if not left <= row < left + seen_rows - 1:
+            left = row - seen_rows // 2
+        if not top <= col < top + seen_cols - 1:
+            top = col - seen_cols // 2
+        self.scroll_to(left, top)
+
+    def zoom(self, steps):
+        cell = self.cell
+        for _ in range(abs(steps)):
+            cell = cell * 2 if steps > 0 else cell // 2
+        cell = max(MIN_CELL, min(MAX_CELL, cell))
+        if cell == self.cell:
+            return
+        seen_rows, seen_cols = self.visible()
+        center_row = self.left + seen_rows // 2
+        center_col = self.top + seen_cols // 2
+        self.cell = cell
+        seen_rows, seen_cols = self.visible()
+        self.left = max(0, min(center_row - seen_rows // 2, self.rows - seen_rows))
+        self.top = max(0, min(center_col - seen_cols // 2, self.cols - seen_cols))
+        self.rebuild()
+
+    def flush(self, current=None):
+        if pygame.display.get_surface() is None or self.background is None:
+            return
+
+        rects = [rect for rect in map(self._paint, self.dirty) if rect is not None]
+        rects += [rect for rect in map(self._paint_span, self.spans) if rect is not None]
+        self.dirty.clear()
+        self.spans.clear()
+        if len(rects) > MAX_RECTS:
+            self.full = True
+        if current != self.current:
+            for i in (self.current, current):
+                rect = None if i is None else self.rect(i)
+                if rect is not None:
+                    rects.append(rect)
+            self.current = current
+        elif current is not None and rects:
+            rect = self.rect(current)
+            if rect is not None:
+                rects.append(rect)
+
+        if self.full:
+            self.win.blit(self.background, (0, 0))
+        elif not rects:
+            return
+        else:
+            for rect in rects:
+                self.win.blit(self.background, rect, rect)
+
+        if current is not None:
+            rect = self.rect(current)
+            if rect is not None:
+                pygame.draw.rect(self.win, HIGHLIGHT, rect, 3)
+
+        if self.full:
+            self.full = False
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
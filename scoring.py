@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+Judgement = namedtuple("Judgement", ["steps", "optimal", "wasted", "reached"])
+Overlap = namedtuple("Overlap", ["matched", "extra", "missed", "jaccard"])
+
+
+def bitmap(cells, size):
+    # Python ints make cheap arbitrary-length bitsets: & and bit_count()
+    # run over machine words instead of per cell.
+    bits = bytearray((size + 7) // 8)
+    for i in cells:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+def optimal_step(dist, a, b, costs=None):
+    # With a distance-to-goal field a move stays on some shortest path
+    # exactly when it brings the player one step closer, or on terrain
+    # exactly as much closer as stepping onto b costs.
+    step = 1 if costs is None else costs[b]
+    return dist[b] >= 0 and dist[a] == dist[b] + step
+
+
+def judge(cells, dist, start, costs=None):
+    # Scores a walk against every shortest path at once, so two different
+    # but equally short routes are judged the same. dist and costs must
+    # come from the same maze, with or without terrain.
+    steps = optimal = 0
+    previous = start
+    for i in cells:
+        if i == previous:
+            continue
+        steps += 1
+        if optimal_step(dist, previous, i, costs):
+            optimal += 1
+        previous = i
+    return Judgement(steps, optimal, steps - optimal, previous is not None and dist[previous] == 0)
+
+
+def optimal_bitmap(dist, start, cols, costs=None):
+    # Every cell on some shortest path from start, found by following
+    # optimal steps down the distance field. Build it once per maze and
+    # score any number of walks against it with overlap().
+    rows = len(dist) // cols
+    seen = {start} if dist[start] >= 0 else set()
+    stack = list(seen)
+    while stack:
+        a = stack.pop()
+        row, col = divmod(a, cols)
+        for b in (a - cols if row else -1, a + cols if row + 1 < rows else -1,
+                  a - 1 if col else -1, a + 1 if col + 1 < cols else -1):
+            if b >= 0 and b not in seen and optimal_step(dist, a, b, costs):
+                seen.add(b)
+                stack.append(b)
+    return bitmap(seen, len(dist))
+
+
+def overlap(path_bits, optimal_bits):
+    # missed counts shortest-path cells the walk never stepped on.
+    matched = (path_bits & optimal_bits).bit_count()
+    extra = path_bits.bit_count() - matched
+    missed = optimal_bits.bit_count() - matched
+    union = (path_bits | optimal_bits).bit_count()
+    return Overlap(matched, extra, missed, matched / union if union else 1.0)
+
+
+class PlayerPath:
+    # Insertion-ordered set of cell indices, so undo is O(1) and a cell
+    # walked twice is only recorded once.
+
+    def __init__(self, cols):
+        self.cols = cols
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __contains__(self, position):
+        row, col = position
+        return row * self.cols + col in self.cells
+
+    def add(self, row, col):
+        self.cells[row * self.cols + col] = None
+
+    def remove(self, row, col):
+        self.cells.pop(row * self.cols + col, None)
+
+    def clear(self):
+        self.cells.clear()
+
+    def positions(self):
+        return [divmod(i, self.cols) for i in self.cells]
+
+    def bits(self, size):
+        return bitmap(self.cells, size)
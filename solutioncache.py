@@ -0,0 +1,67 @@
+import os
+from array import array
+
+import hpa
+from mazefile import MazeFormatError
+from mazestore import MAZE_DIR, atomic_write, checksum
+from solver import distance_field
+
+CACHE_DIR = os.path.join(MAZE_DIR, "solutions")
+
+
+class SolutionCache:
+    # Precomputed search data keyed by the maze checksum, which covers the
+    # wall and terrain planes and start/end. An edited maze gets a new key,
+    # so entries never go stale and do not need to be invalidated. There is
+    # no stored path: the distance field scores any walk in one pass and
+    # the AI's reveal replays its own search.
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+        self.memory = {}
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, digest, suffix):
+        return os.path.join(self.root, digest + suffix)
+
+    def distances(self, maze):
+        # Distance to the goal from every cell, -1 where it cannot be
+        # reached, in terrain costs when the maze has them. Stored as raw
+        # native ints. Cost fields get their own suffix, so step counts
+        # stored before terrain was scored are never reused.
+        digest = checksum(maze)
+        suffix = ".dist" if maze.costs is None else ".cost"
+        key = digest + suffix
+        if key in self.memory:
+            return self.memory[key]
+        dist = array("i")
+        try:
+            with open(self._path(digest, suffix), "rb") as file:
+                dist.frombytes(file.read())
+        except FileNotFoundError:
+            if maze.end is None:
+                return array("i", [-1]) * (maze.rows * maze.cols)
+            dist = distance_field(maze.plane, maze.rows, maze.cols, maze.end, costs=maze.costs)
+            atomic_write(self._path(digest, suffix), dist.tobytes())
+        self.memory[key] = dist
+        return dist
+
+    def abstract_graph(self, maze, cluster=hpa.CLUSTER):
+        # The HPA* graph of the maze, built once and stored next to its
+        # distance field. A stored graph with another block size is rebuilt.
+        digest = checksum(maze)
+        key = digest + ".hpa"
+        graph = self.memory.get(key)
+        if graph is not None and graph.cluster == cluster:
+            return graph
+        try:
+            with open(self._path(digest, ".hpa"), "rb") as file:
+                graph = hpa.parse(file.read())
+        except (FileNotFoundError, MazeFormatError):
+            # A missing or cut-short file is rebuilt like a stale one.
+            graph = None
+        if graph is None or graph.cluster != cluster:
+            graph = hpa.build(maze, cluster)
+            atomic_write(self._path(digest, ".hpa"), hpa.dumps(graph))
+        self.memory[key] = graph
+        return graph
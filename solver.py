@@ -0,0 +1,604 @@
+import heapq
+import time
+from array import array
+from collections import deque, namedtuple
+from functools import partial
+
+FREE = 0
+WALL = 1
+
+# Passability bits, one per direction.
+DOWN = 1
+UP = 2
+RIGHT = 4
+LEFT = 8
+
+_OPEN_AS = {bit: bytes(0 if state == WALL else bit for state in range(256)) for bit in (DOWN, UP, RIGHT, LEFT)}
+
+SolveResult = namedtuple("SolveResult", ["path", "cost", "expanded", "seconds"], defaults=(0.0,))
+
+
+class SearchStats:
+    # Optional instrumentation, passed to a search as stats=. The search fills
+    # in the counters and solve() the phase timers. With trace=True every
+    # expansion is logged to one flat int array as current, number opened,
+    # then the opened cells, and replay() turns it back into (current, opened).
+    # scanned counts the cells jps() steps over between jump points.
+
+    def __init__(self, trace=False):
+        self.expanded = 0
+        self.pushes = 0
+        self.stale = 0
+        self.open_peak = 0
+        self.scanned = 0
+        self.phases = {}
+        self.events = array("i") if trace else None
+
+    def record(self, current, opened):
+        self.events.append(current)
+        self.events.append(len(opened))
+        self.events.extend(opened)
+
+    def replay(self):
+        events = self.events
+        k = 0
+        while k < len(events):
+            n = events[k + 1]
+            yield events[k], events[k + 2:k + 2 + n]
+            k += 2 + n
+
+    def as_dict(self):
+        return {
+            "expanded": self.expanded,
+            "pushes": self.pushes,
+            "stale": self.stale,
+            "open_peak": self.open_peak,
+            "scanned": self.scanned,
+            "phases": dict(self.phases),
+            "events": None if self.events is None else len(self.events),
+        }
+
+
+def _tally(stats, expanded, pushes, pending):
+    # Every entry pushed is either still pending, expanded or a stale
+    # duplicate that was popped and skipped.
+    if stats is not None:
+        stats.expanded = expanded
+        stats.pushes = pushes
+        stats.stale = pushes - pending - expanded
+
+
+def index(row, col, cols):
+    return row * cols + col
+
+
+def position(i, cols):
+    return divmod(i, cols)
+
+
+def wall_plane(spots, rows, cols):
+    plane = bytearray(rows * cols)
+    for spot in spots:
+        if spot.is_barrier():
+            plane[spot.row * cols + spot.col] = WALL
+    return plane
+
+
+def moves(plane, rows, cols, i):
+    row, col = divmod(i, cols)
+    bits = 0
+    if row < rows - 1 and plane[i + cols] != WALL:
+        bits |= DOWN
+    if row > 0 and plane[i - cols] != WALL:
+        bits |= UP
+    if col < cols - 1 and plane[i + 1] != WALL:
+        bits |= RIGHT
+    if col > 0 and plane[i - 1] != WALL:
+        bits |= LEFT
+    return bits
+
+
+def passability(plane, rows, cols):
+    # Every direction is one shifted copy of the plane, so the whole mask is
+    # built with translate() and big-int ORs instead of a per-cell loop.
+    n = rows * cols
+    data = bytes(plane)
+    down = int.from_bytes(data[cols:].translate(_OPEN_AS[DOWN]) + bytes(cols), "little")
+    up = int.from_bytes(bytes(cols) + data[:n - cols].translate(_OPEN_AS[UP]), "little")
+    right = int.from_bytes(data[1:].translate(_OPEN_AS[RIGHT]) + bytes(1), "little")
+    left = int.from_bytes(bytes(1) + data[:n - 1].translate(_OPEN_AS[LEFT]), "little")
+    not_last = int.from_bytes((b"\xff" * (cols - 1) + b"\x00") * rows, "little")
+    not_first = int.from_bytes((b"\x00" + b"\xff" * (cols - 1)) * rows, "little")
+    mask = down | up | (right & not_last) | (left & not_first)
+    return bytearray(mask.to_bytes(n, "little"))
+
+
+def neighbors(plane, rows, cols, i, mask=None):
+    bits = mask[i] if mask is not None else moves(plane, rows, cols, i)
+    if bits & DOWN:
+        yield i + cols
+    if bits & UP:
+        yield i - cols
+    if bits & RIGHT:
+        yield i + 1
+    if bits & LEFT:
+        yield i - 1
+
+
+def distance_field(plane, rows, cols, goal, mask=None, costs=None):
+    # Breadth-first wavefront from the goal: every cell gets its true
+    # distance to the goal, -1 for walls and cells that cannot reach it.
+    # With a cost plane it is the cheapest cost to the goal instead, found
+    # with Dijkstra run backwards from the goal.
+    dist = array("i", [-1]) * (rows * cols)
+    if plane[goal] == WALL:
+        return dist
+    if mask is None:
+        mask = passability(plane, rows, cols)
+    steps = ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+    dist[goal] = 0
+    if costs is not None:
+        heap = [(0, goal)]
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d != dist[current]:
+                continue
+            # Any neighbour reaches the goal through current by stepping onto it.
+            d += costs[current]
+            bits = mask[current]
+            for bit, step in steps:
+                if bits & bit:
+                    neighbor = current + step
+                    if dist[neighbor] == -1 or d < dist[neighbor]:
+                        dist[neighbor] = d
+                        heapq.heappush(heap, (d, neighbor))
+        return dist
+    frontier = [goal]
+    d = 0
+    while frontier:
+        d += 1
+        next_frontier = []
+        for current in frontier:
+            bits = mask[current]
+            for bit, step in steps:
+                if bits & bit:
+                    neighbor = current + step
+                    if dist[neighbor] == -1:
+                        dist[neighbor] = d
+                        next_frontier.append(neighbor)
+        frontier = next_frontier
+    return dist
+
+
+def h(a, b, cols):
+    ar, ac = divmod(a, cols)
+    br, bc = divmod(b, cols)
+    return abs(ar - br) + abs(ac - bc)
+
+
+def reconstruct_path(came_from, end):
+    path = [end]
+    current = end
+    while came_from[current] != -1:
+        current = came_from[current]
+        path.append(current)
+    path.reverse()
+    return path
+
+
+def astar(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None):
+    n = rows * cols
+    g_score = array("i", [-1]) * n
+    came_from = array("i", [-1]) * n
+    closed = bytearray(n)
+    end_row, end_col = divmod(end, cols)
+    # DOWN, UP, RIGHT, LEFT
+    steps = ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+
+    count = 0
+    g_score[start] = 0
+    # Ties on f go to the deeper entry, pushed with -g, so an open area is
+    # crossed straight instead of filled in layer by layer.
+    open_set = [(h(start, end, cols), 0, count, start)]
+    expanded = 0
+
+    while open_set:
+        _, _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+
+        if current == end:
+            _tally(stats, expanded, count + 1, len(open_set))
+            return SolveResult(reconstruct_path(came_from, end), g_score[end], expanded)
+
+        temp_g_score = g_score[current] + 1
+        opened = [] if on_expand is not None else None
+        bits = mask[current] if mask is not None else moves(plane, rows, cols, current)
+        for bit, step in steps:
+            if not bits & bit:
+                continue
+            neighbor = current + step
+            if closed[neighbor]:
+                continue
+            old = g_score[neighbor]
+            if old == -1 or temp_g_score < old:
+                came_from[neighbor] = current
+                g_score[neighbor] = temp_g_score
+                nr, nc = divmod(neighbor, cols)
+                f = temp_g_score + abs(nr - end_row) + abs(nc - end_col)
+                count += 1
+                heapq.heappush(open_set, (f, -temp_g_score, count, neighbor))
+                if opened is not None:
+                    opened.append(neighbor)
+
+        if stats is not None and len(open_set) > stats.open_peak:
+            stats.open_peak = len(open_set)
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, count + 1, 0)
+    return SolveResult([], None, expanded)
+
+
+def bfs(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None):
+    # Unit costs make first discovery optimal, so no priority queue needed.
+    came_from = array("i", [-1]) * (rows * cols)
+    seen = bytearray(rows * cols)
+    seen[start] = 1
+    queue = deque([start])
+    expanded = 0
+
+    while queue:
+        current = queue.popleft()
+        expanded += 1
+        if current == end:
+            _tally(stats, expanded, expanded + len(queue), len(queue))
+            path = reconstruct_path(came_from, end)
+            return SolveResult(path, len(path) - 1, expanded)
+
+        opened = [] if on_expand is not None else None
+        for neighbor in neighbors(plane, rows, cols, current, mask):
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                came_from[neighbor] = current
+                queue.append(neighbor)
+                if opened is not None:
+                    opened.append(neighbor)
+
+        if stats is not None and len(queue) > stats.open_peak:
+            stats.open_peak = len(queue)
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, expanded, 0)
+    return SolveResult([], None, expanded)
+
+
+def dijkstra(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None):
+    n = rows * cols
+    g_score = array("i", [-1]) * n
+    came_from = array("i", [-1]) * n
+    closed = bytearray(n)
+    g_score[start] = 0
+    count = 0
+    # Ties on g go to the cell nearer the goal, which only reorders the
+    # last layer: Dijkstra still settles every cell closer than the goal.
+    open_set = [(0, h(start, end, cols), count, start)]
+    expanded = 0
+
+    while open_set:
+        g, _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == end:
+            _tally(stats, expanded, count + 1, len(open_set))
+            return SolveResult(reconstruct_path(came_from, end), g, expanded)
+
+        opened = [] if on_expand is not None else None
+        for neighbor in neighbors(plane, rows, cols, current, mask):
+            old = g_score[neighbor]
+            if not closed[neighbor] and (old == -1 or g + 1 < old):
+                g_score[neighbor] = g + 1
+                came_from[neighbor] = current
+                count += 1
+                heapq.heappush(open_set, (g + 1, h(neighbor, end, cols), count, neighbor))
+                if opened is not None:
+                    opened.append(neighbor)
+
+        if stats is not None and len(open_set) > stats.open_peak:
+            stats.open_peak = len(open_set)
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, count + 1, 0)
+    return SolveResult([], None, expanded)
+
+
+def bidirectional_astar(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None):
+    # One A* from each end, each aimed at the other end. Either frontier's
+    # smallest f is a lower bound on any path not found yet, so the search
+    # stops once that bound reaches the best meeting cost seen so far.
+    if start == end:
+        _tally(stats, 0, 0, 0)
+        return SolveResult([start], 0, 0)
+
+    n = rows * cols
+    sides = []
+    for origin, target in ((start, end), (end, start)):
+        g_score = array("i", [-1]) * n
+        g_score[origin] = 0
+        sides.append((g_score, array("i", [-1]) * n, bytearray(n), [(h(origin, target, cols), 0, 0, origin)], target))
+
+    best = -1
+    meet = -1
+    count = 0
+    expanded = 0
+
+    while sides[0][3] and sides[1][3]:
+        if best != -1 and (sides[0][3][0][0] >= best or sides[1][3][0][0] >= best):
+            break
+
+        forward = len(sides[0][3]) <= len(sides[1][3])
+        g_score, came_from, closed, open_set, target = sides[0 if forward else 1]
+        other_g = sides[1 if forward else 0][0]
+
+        _, _, _, current = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+
+        opened = [] if on_expand is not None else None
+        temp_g_score = g_score[current] + 1
+        for neighbor in neighbors(plane, rows, cols, current, mask):
+            old = g_score[neighbor]
+            if not closed[neighbor] and (old == -1 or temp_g_score < old):
+                g_score[neighbor] = temp_g_score
+                came_from[neighbor] = current
+                count += 1
+                # Deeper entries first on equal f, as in astar().
+                heapq.heappush(open_set, (temp_g_score + h(neighbor, target, cols), -temp_g_score, count, neighbor))
+                if opened is not None:
+                    opened.append(neighbor)
+                if other_g[neighbor] != -1 and (best == -1 or temp_g_score + other_g[neighbor] < best):
+                    best = temp_g_score + other_g[neighbor]
+                    meet = neighbor
+
+        if stats is not None and len(sides[0][3]) + len(sides[1][3]) > stats.open_peak:
+            stats.open_peak = len(sides[0][3]) + len(sides[1][3])
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, count + 2, len(sides[0][3]) + len(sides[1][3]))
+    if best == -1:
+        return SolveResult([], None, expanded)
+
+    path = reconstruct_path(sides[0][1], meet)
+    tail = reconstruct_path(sides[1][1], meet)
+    path.extend(reversed(tail[:-1]))
+    return SolveResult(path, best, expanded)
+
+
+def jps(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None):
+    # Jump point search for 4-connected grids. Horizontal runs only stop at
+    # the goal or where a cell above/below opens up behind a wall, so
+    # vertical runs have to try a horizontal run at every step to find the
+    # rows worth turning into. That keeps the open list short but is not
+    # cheaper than astar(): open areas get scanned row by row, which
+    # stats.scanned reports. A local forced-neighbour check on vertical
+    # runs is not enough, it loses the turns into open rows.
+    def free(row, col):
+        return 0 <= row < rows and 0 <= col < cols and plane[row * cols + col] != WALL
+
+    end_row, end_col = divmod(end, cols)
+    scanned = 0
+
+    def jump_horizontal(row, col, dc):
+        nonlocal scanned
+        while True:
+            col += dc
+            scanned += 1
+            if not free(row, col):
+                return None
+            if row == end_row and col == end_col:
+                return row, col
+            for dr in (1, -1):
+                if free(row + dr, col) and not free(row + dr, col - dc):
+                    return row, col
+
+    def jump_vertical(row, col, dr):
+        nonlocal scanned
+        while True:
+            row += dr
+            scanned += 1
+            if not free(row, col):
+                return None
+            if row == end_row and col == end_col:
+                return row, col
+            if jump_horizontal(row, col, 1) or jump_horizontal(row, col, -1):
+                return row, col
+
+    def successors(row, col, dr, dc):
+        if dr == 0 and dc == 0:
+            directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+        elif dr:
+            directions = ((dr, 0), (0, 1), (0, -1))
+        else:
+            directions = [(0, dc)] + [(d, 0) for d in (1, -1) if free(row + d, col) and not free(row + d, col - dc)]
+        for ddr, ddc in directions:
+            point = jump_vertical(row, col, ddr) if ddr else jump_horizontal(row, col, ddc)
+            if point is not None:
+                yield point, ddr, ddc
+
+    n = rows * cols
+    g_score = array("i", [-1]) * n
+    came_from = array("i", [-1]) * n
+    closed = bytearray(n)
+    g_score[start] = 0
+    count = 0
+    open_set = [(h(start, end, cols), 0, count, start, 0, 0)]
+    expanded = 0
+
+    while open_set:
+        _, _, _, current, dr, dc = heapq.heappop(open_set)
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == end:
+            _tally(stats, expanded, count + 1, len(open_set))
+            if stats is not None:
+                stats.scanned = scanned
+            points = reconstruct_path(came_from, end)
+            path = [points[0]]
+            for a, b in zip(points, points[1:]):
+                step = 1 if a // cols == b // cols else cols
+                if b < a:
+                    step = -step
+                path.extend(range(a + step, b + step, step))
+            return SolveResult(path, g_score[end], expanded)
+
+        row, col = divmod(current, cols)
+        opened = [] if on_expand is not None else None
+        for (nr, nc), ndr, ndc in successors(row, col, dr, dc):
+            neighbor = nr * cols + nc
+            g = g_score[current] + abs(nr - row) + abs(nc - col)
+            old = g_score[neighbor]
+            if not closed[neighbor] and (old == -1 or g < old):
+                g_score[neighbor] = g
+                came_from[neighbor] = current
+                count += 1
+                heapq.heappush(open_set, (g + h(neighbor, end, cols), -g, count, neighbor, ndr, ndc))
+                if opened is not None:
+                    opened.append(neighbor)
+
+        if stats is not None and len(open_set) > stats.open_peak:
+            stats.open_peak = len(open_set)
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, count + 1, 0)
+    if stats is not None:
+        stats.scanned = scanned
+    return SolveResult([], None, expanded)
+
+
+def dial(plane, rows, cols, start, end, on_expand=None, mask=None, stats=None, costs=None):
+    # A* for small integer step costs, with a ring of buckets indexed by f
+    # in place of the heap. Stepping onto a cell costs costs[cell], 1 to 255,
+    # or 1 without a cost plane. f never drops and grows by at most the
+    # largest step cost plus the cheapest one per step, so a ring that long
+    # holds the whole open set and pushes and pops are O(1).
+    n = rows * cols
+    low = high = 1
+    if costs is not None:
+        low, high = max(1, min(costs)), max(costs)
+    size = high + low + 1
+    buckets = [[] for _ in range(size)]
+    g_score = array("i", [-1]) * n
+    came_from = array("i", [-1]) * n
+    closed = bytearray(n)
+    end_row, end_col = divmod(end, cols)
+    steps = ((DOWN, cols), (UP, -cols), (RIGHT, 1), (LEFT, -1))
+
+    g_score[start] = 0
+    f = h(start, end, cols) * low
+    buckets[f % size].append(start)
+    pending = pushes = 1
+    expanded = 0
+
+    while pending:
+        bucket = buckets[f % size]
+        if not bucket:
+            f += 1
+            continue
+        current = bucket.pop()
+        pending -= 1
+        if closed[current]:
+            continue
+        closed[current] = 1
+        expanded += 1
+        if current == end:
+            _tally(stats, expanded, pushes, pending)
+            return SolveResult(reconstruct_path(came_from, end), g_score[end], expanded)
+
+        g = g_score[current]
+        opened = [] if on_expand is not None else None
+        bits = mask[current] if mask is not None else moves(plane, rows, cols, current)
+        for bit, step in steps:
+            if not bits & bit:
+                continue
+            neighbor = current + step
+            if closed[neighbor]:
+                continue
+            temp_g_score = g + (1 if costs is None else costs[neighbor])
+            old = g_score[neighbor]
+            if old == -1 or temp_g_score < old:
+                g_score[neighbor] = temp_g_score
+                came_from[neighbor] = current
+                nr, nc = divmod(neighbor, cols)
+                buckets[(temp_g_score + (abs(nr - end_row) + abs(nc - end_col)) * low) % size].append(neighbor)
+                pending += 1
+                pushes += 1
+                if opened is not None:
+                    opened.append(neighbor)
+
+        if stats is not None and pending > stats.open_peak:
+            stats.open_peak = pending
+        if on_expand is not None:
+            on_expand(current, opened)
+
+    _tally(stats, expanded, pushes, 0)
+    return SolveResult([], None, expanded)
+
+
+SOLVERS = {
+    "astar": astar,
+    "bfs": bfs,
+    "dijkstra": dijkstra,
+    "bidirectional": bidirectional_astar,
+    "jps": jps,
+    "dial": dial,
+}
+
+# Solvers that can take a terrain cost plane as costs=.
+WEIGHTED = ("dial",)
+
+
+def solve(name, plane, rows, cols, start, end, on_expand=None, mask=None, stats=None, costs=None):
+    started = time.perf_counter()
+    search = SOLVERS[name]
+    if costs is not None:
+        if name not in WEIGHTED:
+            raise ValueError(f"{name} only does unit costs, use one of {', '.join(WEIGHTED)} for terrain")
+        search = partial(search, costs=costs)
+    if stats is None:
+        result = search(plane, rows, cols, start, end, on_expand, mask)
+        return result._replace(seconds=time.perf_counter() - started)
+
+    # Time spent in callbacks, usually drawing, is kept apart from the search.
+    if mask is None:
+        mask = passability(plane, rows, cols)
+    searching = time.perf_counter()
+    stats.phases["mask"] = searching - started
+    spent = 0.0
+    expand = None
+    if on_expand is not None or stats.events is not None:
+        def expand(current, opened):
+            nonlocal spent
+            t0 = time.perf_counter()
+            if stats.events is not None:
+                stats.record(current, opened)
+            if on_expand is not None:
+                on_expand(current, opened)
+            spent += time.perf_counter() - t0
+
+    result = search(plane, rows, cols, start, end, expand, mask, stats)
+    finished = time.perf_counter()
+    stats.phases["search"] = finished - searching - spent
+    stats.phases["callbacks"] = spent
+    return result._replace(seconds=finished - started)
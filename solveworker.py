@@ -0,0 +1,66 @@
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from solver import SearchStats, solve
+
+PROGRESS_EVERY = 1024  # expansions between progress, cancel and deadline checks
+
+
+class SolveJob:
+    # Handle for one background solve. future resolves to the SolveResult,
+    # stats fills in as the search runs and expanded can be polled at any
+    # time. Cancelling or passing the deadline makes the search raise
+    # CancelledError or TimeoutError out of its next progress check.
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.expanded = 0
+        self.future = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+
+class SolveWorker:
+    # Runs solves off the game loop thread, so the window keeps drawing and
+    # handling input while a large maze is searched.
+
+    def __init__(self, workers=1):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="solver")
+        self.jobs = []
+
+    def submit(self, name, maze, trace=False, timeout=None, on_progress=None):
+        job = SolveJob(SearchStats(trace))
+        deadline = None if timeout is None else time.perf_counter() + timeout
+
+        def check(current, opened):
+            job.expanded += 1
+            if job.expanded % PROGRESS_EVERY:
+                return
+            if job._cancel.is_set():
+                raise CancelledError()
+            if deadline is not None and time.perf_counter() > deadline:
+                raise TimeoutError(f"{name} gave up after {timeout} s")
+            if on_progress is not None:
+                on_progress(job.expanded)
+
+        job.future = self.pool.submit(
+            solve, name, maze.plane, maze.rows, maze.cols, maze.start, maze.end, check, None, job.stats, maze.costs)
+        self.jobs = [other for other in self.jobs if not other.done()]
+        self.jobs.append(job)
+        return job
+
+    def shutdown(self):
+        # Running searches stop at their next check instead of holding up exit.
+        for job in self.jobs:
+            job.cancel()
+        self.pool.shutdown(wait=True)
@@ -0,0 +1,76 @@
+import random
+
+from edittools import brush, flood_fill, invert, line, rectangle
+from solver import FREE, WALL
+from test_solver import neighbours
+
+
+def region(plane, rows, cols, i):
+    # Cells 4-connected to i that are walls when i is one, open otherwise.
+    is_wall = plane[i] == WALL
+    seen = {i}
+    stack = [i]
+    while stack:
+        for j in neighbours(stack.pop(), rows, cols):
+            if j not in seen and (plane[j] == WALL) == is_wall:
+                seen.add(j)
+                stack.append(j)
+    return seen
+
+
+def covered(spans, cols):
+    return {row * cols + col for row, col0, col1 in spans for col in range(col0, col1)}
+
+
+def test_flood_fill_matches_reference():
+    rng = random.Random(0)
+    for _ in range(500):
+        rows, cols = rng.randint(1, 20), rng.randint(1, 20)
+        # Open cells hold other states too, as on the editor's state plane.
+        plane = bytearray(WALL if rng.random() < 0.4 else rng.choice((FREE, FREE, 2, 8)) for _ in range(rows * cols))
+        i = rng.randrange(rows * cols)
+        expected = region(plane, rows, cols, i)
+        before = bytes(plane)
+        state = rng.choice((FREE, WALL))
+        spans = flood_fill(plane, rows, cols, i, state)
+        assert covered(spans, cols) == expected
+        for j in range(rows * cols):
+            assert plane[j] == (state if j in expected else before[j])
+
+
+def test_flood_fill_into_another_plane():
+    rng = random.Random(1)
+    rows, cols = 12, 17
+    plane = bytearray(WALL if rng.random() < 0.3 else FREE for _ in range(rows * cols))
+    plane[0] = FREE
+    costs = bytearray([2]) * (rows * cols)
+    before = bytes(plane)
+    flood_fill(plane, rows, cols, 0, 8, into=costs)
+    assert plane == before
+    assert {j for j in range(rows * cols) if costs[j] == 8} == region(plane, rows, cols, 0)
+
+
+def test_line_has_no_diagonal_gaps():
+    rng = random.Random(2)
+    cols = 30
+    for _ in range(200):
+        a, b = rng.randrange(cols * cols), rng.randrange(cols * cols)
+        cells = list(line(a, b, cols))
+        assert cells[0] == a and cells[-1] == b
+        for p, q in zip(cells, cells[1:]):
+            assert q in set(neighbours(p, cols, cols))
+
+
+def test_rectangle_brush_and_invert_spans():
+    rows, cols = 9, 11
+    plane = bytearray(rows * cols)
+    spans = rectangle(plane, rows, cols, 5 * cols + 7, 2 * cols + 3, WALL)
+    assert covered(spans, cols) == {r * cols + c for r in range(2, 6) for c in range(3, 8)}
+    assert plane.count(WALL) == 20
+    spans = brush(plane, rows, cols, [0], 1, WALL)
+    assert covered(spans, cols) >= {0, 1, cols, cols + 1}
+    assert all(plane[j] == WALL for j in covered(spans, cols))
+    before = bytes(plane)
+    spans = invert(plane, rows, cols)
+    assert covered(spans, cols) == set(range(rows * cols))
+    assert all((plane[j] == WALL) != (before[j] == WALL) for j in range(rows * cols))
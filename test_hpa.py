@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import hpa
+from mazefile import Maze, MazeFormatError
+from solver import FREE, WALL, solve
+from test_solver import TERRAIN, check_path
+
+
+def random_maze(rng, weighted):
+    rows, cols = rng.randint(1, 30), rng.randint(1, 30)
+    density = rng.choice((0.0, 0.2, 0.35))
+    plane = bytearray(WALL if rng.random() < density else FREE for _ in range(rows * cols))
+    costs = bytes(rng.choice(TERRAIN) for _ in range(rows * cols)) if weighted else None
+    return Maze(rows, cols, None, None, plane, costs)
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("cluster", [3, 4, 8])
+def test_paths_are_valid_and_never_shorter_than_exact(weighted, cluster):
+    rng = random.Random(f"{weighted}-{cluster}")
+    for _ in range(60):
+        maze = random_maze(rng, weighted)
+        graph = hpa.build(maze, cluster)
+        n = maze.rows * maze.cols
+        for _ in range(10):
+            start, end = rng.randrange(n), rng.randrange(n)
+            name = "bfs" if maze.costs is None else "dial"
+            exact = solve(name, maze.plane, maze.rows, maze.cols, start, end, costs=maze.costs).cost
+            if maze.plane[start] == WALL or maze.plane[end] == WALL:
+                exact = None
+            result = hpa.hpa(graph, maze, start, end)
+            assert (result.cost is None) == (exact is None)
+            if exact is not None:
+                assert result.cost >= exact
+                check_path(result.path, result.cost, maze.plane, maze.rows, maze.cols, start, end, maze.costs)
+
+
+def test_queries_in_one_block_are_exact():
+    rng = random.Random(2)
+    for _ in range(100):
+        maze = random_maze(rng, weighted=False)
+        graph = hpa.build(maze, max(maze.rows, maze.cols))
+        start, end = rng.randrange(maze.rows * maze.cols), rng.randrange(maze.rows * maze.cols)
+        if maze.plane[start] == WALL or maze.plane[end] == WALL:
+            continue
+        exact = solve("bfs", maze.plane, maze.rows, maze.cols, start, end).cost
+        assert hpa.hpa(graph, maze, start, end).cost == exact
+
+
+def test_graph_round_trips():
+    maze = random_maze(random.Random(3), weighted=True)
+    graph = hpa.build(maze, 4)
+    data = hpa.dumps(graph)
+    copy = hpa.parse(data)
+    assert (copy.rows, copy.cols, copy.cluster) == (graph.rows, graph.cols, graph.cluster)
+    for field in ("cluster_first", "nodes", "edge_first", "edge_to", "edge_cost"):
+        assert getattr(copy, field) == getattr(graph, field)
+    with pytest.raises(MazeFormatError):
+        hpa.parse(data[:-1])
+    with pytest.raises(MazeFormatError):
+        hpa.parse(b"AMZE" + data[4:])
@@ -0,0 +1,73 @@
+import json
+import random
+
+import pytest
+
+import mazefile
+from mazefile import COSTS, HEADER, MAGIC, VERSION, Maze, MazeFormatError
+from solver import FREE, WALL
+
+
+def random_maze(rng, weighted=False):
+    rows, cols = rng.randint(1, 40), rng.randint(1, 40)
+    plane = bytearray(WALL if rng.random() < 0.3 else FREE for _ in range(rows * cols))
+    start = rng.choice((None, rng.randrange(rows * cols)))
+    end = rng.choice((None, rng.randrange(rows * cols)))
+    costs = bytes(rng.randint(1, 255) for _ in range(rows * cols)) if weighted else None
+    return Maze(rows, cols, start, end, plane, costs)
+
+
+def same(a, b):
+    return (a.rows, a.cols, a.start, a.end, bytes(a.plane)) == (b.rows, b.cols, b.start, b.end, bytes(b.plane)) \
+        and (a.costs is None) == (b.costs is None) and (a.costs is None or bytes(a.costs) == bytes(b.costs))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_round_trip(weighted, tmp_path):
+    rng = random.Random(weighted)
+    for k in range(50):
+        maze = random_maze(rng, weighted)
+        assert same(mazefile.parse(mazefile.dumps(maze)), maze)
+        name = str(tmp_path / f"{k}.maze")
+        mazefile.save(name, maze)
+        assert same(mazefile.load(name), maze)
+
+
+def header(rows=2, cols=2, start=0, end=3, magic=MAGIC, version=VERSION, flags=0):
+    return HEADER.pack(magic, version, flags, 0, rows, cols, start, end)
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    header()[:-1],
+    header(magic=b"XMZE") + bytes(4),
+    header(version=VERSION + 1) + bytes(4),
+    header(flags=2) + bytes(4),
+    header() + bytes(3),
+    header(flags=COSTS) + bytes(7),
+    header(start=4) + bytes(4),
+    header(end=4) + bytes(4),
+])
+def test_rejects_broken_files(data):
+    with pytest.raises(MazeFormatError):
+        mazefile.parse(data)
+
+
+def test_load_rejects_empty_file(tmp_path):
+    name = tmp_path / "empty.maze"
+    name.write_bytes(b"")
+    with pytest.raises(MazeFormatError):
+        mazefile.load(str(name))
+
+
+def test_convert_json(tmp_path):
+    # The old format: one [row, col, color] entry per cell.
+    cells = [[row, col, mazefile.WALL_COLOR if (row, col) == (0, 1) else [255, 255, 255]]
+             for row in range(2) for col in range(3)]
+    cells[0][2] = mazefile.START_COLOR
+    cells[-1][2] = mazefile.END_COLOR
+    name = tmp_path / "old.json"
+    name.write_text(json.dumps(cells))
+    maze = mazefile.load(mazefile.convert(str(name)))
+    assert (maze.rows, maze.cols, maze.start, maze.end) == (2, 3, 0, 5)
+    assert bytes(maze.plane) == bytes([FREE, WALL, FREE, FREE, FREE, FREE])
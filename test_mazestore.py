@@ -0,0 +1,65 @@
+import json
+import os
+import random
+
+from mazefile import Maze
+from mazestore import INDEX_FILE, QUARANTINE_DIR, MazeStore, checksum
+from solver import FREE, WALL
+
+
+def random_maze(rng, rows=6, cols=9):
+    plane = bytearray(WALL if rng.random() < 0.3 else FREE for _ in range(rows * cols))
+    return Maze(rows, cols, 0, rows * cols - 1, plane)
+
+
+def test_save_and_load(tmp_path):
+    rng = random.Random(0)
+    store = MazeStore(str(tmp_path))
+    mazes = [random_maze(rng) for _ in range(5)]
+    ids = [store.save(maze) for maze in mazes]
+    assert ids == [1, 2, 3, 4, 5]
+    # A maze saved twice keeps its id.
+    assert store.save(mazes[2]) == 3
+    reopened = MazeStore(str(tmp_path))
+    assert reopened.ids() == ids
+    for maze_id, maze in zip(ids, mazes):
+        assert bytes(reopened.load(maze_id).plane) == bytes(maze.plane)
+        assert reopened.by_checksum(checksum(maze)) == maze_id
+
+
+def test_save_over_an_id(tmp_path):
+    rng = random.Random(1)
+    store = MazeStore(str(tmp_path))
+    first = random_maze(rng)
+    store.save(first)
+    second = random_maze(rng)
+    assert store.save(second, 1) == 1
+    assert store.by_checksum(checksum(first)) is None
+    assert bytes(store.load(1).plane) == bytes(second.plane)
+    assert store.by_size(6, 9) == [1]
+
+
+def test_random_id(tmp_path):
+    store = MazeStore(str(tmp_path))
+    assert store.random_id() is None
+    rng = random.Random(2)
+    for _ in range(3):
+        store.save(random_maze(rng))
+    assert {store.random_id(rng) for _ in range(50)} == {1, 2, 3}
+
+
+def test_quarantine(tmp_path):
+    rng = random.Random(3)
+    store = MazeStore(str(tmp_path))
+    maze = random_maze(rng)
+    store.save(maze)
+    store.save(random_maze(rng))
+    store.quarantine(1, ["no path"])
+    assert store.ids() == [2] and 1 not in store
+    assert MazeStore(str(tmp_path)).ids() == [2]
+    directory = tmp_path / QUARANTINE_DIR
+    with open(directory / INDEX_FILE) as file:
+        record = json.load(file)[checksum(maze)]
+    assert record["id"] == 1 and record["problems"] == ["no path"]
+    assert os.path.exists(directory / record["file"])
+    assert not os.path.exists(tmp_path / "1.maze")
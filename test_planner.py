@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from cellstate import END, START
+from planner import LPAStar
+from solver import FREE, WALL, solve
+from test_solver import TERRAIN, check_path
+
+
+def random_plane(rng, weighted):
+    rows, cols = rng.randint(2, 14), rng.randint(2, 14)
+    plane = bytearray(WALL if rng.random() < 0.25 else FREE for _ in range(rows * cols))
+    start, end = rng.sample(range(rows * cols), 2)
+    # A state plane, as developer mode plans over.
+    plane[start], plane[end] = START, END
+    costs = bytearray(rng.choice(TERRAIN) for _ in range(rows * cols)) if weighted else None
+    return plane, rows, cols, start, end, costs
+
+
+def expected_cost(plane, rows, cols, start, end, costs):
+    walls = bytes(WALL if state == WALL else FREE for state in plane)
+    if costs is None:
+        return solve("bfs", walls, rows, cols, start, end).cost
+    return solve("dial", walls, rows, cols, start, end, costs=costs).cost
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+@pytest.mark.parametrize("budget", [None, 3])
+def test_repairs_match_a_fresh_search(weighted, budget):
+    rng = random.Random(f"{weighted}-{budget}")
+    for _ in range(150):
+        plane, rows, cols, start, end, costs = random_plane(rng, weighted)
+        planner = LPAStar(plane, rows, cols, start, end, costs)
+        for _ in range(15):
+            while not planner.settled():
+                planner.compute(budget)
+            cost = planner.cost()
+            assert cost == expected_cost(plane, rows, cols, start, end, costs)
+            if cost is not None:
+                check_path(planner.path(), cost, plane, rows, cols, start, end, costs)
+            for i in rng.sample(range(rows * cols), rng.randint(1, 4)):
+                if i in (start, end):
+                    continue
+                if costs is not None and rng.random() < 0.5:
+                    costs[i] = rng.choice(TERRAIN)
+                else:
+                    plane[i] = FREE if plane[i] == WALL else WALL
+                planner.update(i)
+
+
+def test_budget_limits_expansions():
+    size = 40
+    planner = LPAStar(bytearray(size * size), size, size, 0, size * size - 1)
+    assert planner.compute(5) == 5
+    assert not planner.settled()
+    while not planner.settled():
+        planner.compute(5)
+    assert planner.cost() == 2 * (size - 1)
@@ -0,0 +1,126 @@
+import heapq
+import random
+
+import pytest
+
+from solver import FREE, SOLVERS, WALL, WEIGHTED, SearchStats, distance_field, solve
+
+TERRAIN = (1, 2, 4, 8)
+
+
+def random_maze(rng, density=None, weighted=False):
+    rows, cols = rng.randint(1, 24), rng.randint(1, 24)
+    density = rng.choice((0.0, 0.1, 0.3, 0.45)) if density is None else density
+    plane = bytearray(WALL if rng.random() < density else FREE for _ in range(rows * cols))
+    start, end = rng.randrange(rows * cols), rng.randrange(rows * cols)
+    plane[start] = plane[end] = FREE
+    costs = bytes(rng.choice(TERRAIN) for _ in range(rows * cols)) if weighted else None
+    return plane, rows, cols, start, end, costs
+
+
+def neighbours(i, rows, cols):
+    row, col = divmod(i, cols)
+    if row > 0:
+        yield i - cols
+    if row < rows - 1:
+        yield i + cols
+    if col > 0:
+        yield i - 1
+    if col < cols - 1:
+        yield i + 1
+
+
+def reference(plane, rows, cols, source, costs=None, reverse=False):
+    # Plain Dijkstra from source, stepping onto a cell costs costs[cell].
+    # With reverse the steps are walked backwards, so dist[i] is the cost
+    # of getting from i to source.
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        d, i = heapq.heappop(heap)
+        if d > dist[i]:
+            continue
+        for j in neighbours(i, rows, cols):
+            step = 1 if costs is None else costs[i if reverse else j]
+            if plane[j] != WALL and d + step < dist.get(j, d + step + 1):
+                dist[j] = d + step
+                heapq.heappush(heap, (d + step, j))
+    return dist
+
+
+def check_path(path, cost, plane, rows, cols, start, end, costs=None):
+    assert path[0] == start and path[-1] == end
+    for a, b in zip(path, path[1:]):
+        assert b in set(neighbours(a, rows, cols))
+        assert plane[b] != WALL
+    assert sum(1 if costs is None else costs[i] for i in path[1:]) == cost
+
+
+@pytest.mark.parametrize("name", sorted(SOLVERS))
+def test_solvers_match_reference(name):
+    rng = random.Random(name)
+    for _ in range(300):
+        plane, rows, cols, start, end, _ = random_maze(rng)
+        expected = reference(plane, rows, cols, start).get(end)
+        result = solve(name, plane, rows, cols, start, end)
+        assert result.cost == expected
+        if expected is None:
+            assert result.path == []
+        else:
+            check_path(result.path, result.cost, plane, rows, cols, start, end)
+
+
+@pytest.mark.parametrize("name", WEIGHTED)
+def test_weighted_solvers_match_reference(name):
+    rng = random.Random(name)
+    for _ in range(300):
+        plane, rows, cols, start, end, costs = random_maze(rng, weighted=True)
+        expected = reference(plane, rows, cols, start, costs).get(end)
+        result = solve(name, plane, rows, cols, start, end, costs=costs)
+        assert result.cost == expected
+        if expected is not None:
+            check_path(result.path, result.cost, plane, rows, cols, start, end, costs)
+
+
+def test_unit_cost_solvers_refuse_costs():
+    plane, rows, cols, start, end, costs = random_maze(random.Random(0), weighted=True)
+    for name in set(SOLVERS) - set(WEIGHTED):
+        with pytest.raises(ValueError):
+            solve(name, plane, rows, cols, start, end, costs=costs)
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_distance_field_matches_reference(weighted):
+    rng = random.Random(weighted)
+    for _ in range(200):
+        plane, rows, cols, _, end, costs = random_maze(rng, weighted=weighted)
+        expected = reference(plane, rows, cols, end, costs, reverse=True)
+        dist = distance_field(plane, rows, cols, end, costs=costs)
+        assert list(dist) == [expected.get(i, -1) for i in range(rows * cols)]
+
+
+def test_astar_crosses_open_grid_without_filling_it():
+    size = 128
+    plane = bytearray(size * size)
+    stats = SearchStats()
+    result = solve("astar", plane, size, size, 0, size * size - 1, stats=stats)
+    assert result.cost == 2 * (size - 1)
+    assert stats.expanded < 2 * size
+
+
+def test_stats_add_up():
+    rng = random.Random(1)
+    for name in sorted(SOLVERS):
+        plane, rows, cols, start, end, _ = random_maze(rng, density=0.2)
+        stats = SearchStats(trace=True)
+        result = solve(name, plane, rows, cols, start, end, stats=stats)
+        assert stats.expanded == result.expanded
+        assert stats.stale >= 0
+        assert sum(1 for _ in stats.replay()) <= result.expanded
+
+
+def test_jps_reports_scanned_cells():
+    size = 32
+    stats = SearchStats()
+    solve("jps", bytearray(size * size), size, size, 0, size * size - 1, stats=stats)
+    assert stats.scanned >= 2 * (size - 1)
@@ -0,0 +1,74 @@
+import pygame
+
+FPS = 60
+
+
+def wait_events(timeout=0):
+    # Sleeps until there is input, or for at most timeout ms when timeout
+    # is positive, then returns everything that is queued.
+    event = pygame.event.wait(timeout)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    events.extend(pygame.event.get())
+    return events
+
+
+class Toasts:
+    # A timed message drawn over the board without blocking the game. Call
+    # update() before the board is flushed and draw() after it, and sleep
+    # no longer than timeout() so the message is taken down on time. A new
+    # message replaces the one on screen.
+
+    def __init__(self, win, renderer, center, font_size, color, bg_color):
+        self.win = win
+        self.renderer = renderer
+        self.center = center
+        self.font_size = font_size
+        self.color = color
+        self.bg_color = bg_color
+        self.font = None
+        self.text = None
+        self.rect = None
+        self.expires = 0
+
+    def show(self, message, duration):
+        if self.font is None:
+            self.font = pygame.font.SysFont(None, self.font_size)
+        if self.text is not None:
+            self.hide()
+        self.text = self.font.render(message, True, self.color)
+        self.rect = self.text.get_rect(center=self.center)
+        self.expires = pygame.time.get_ticks() + duration
+
+    def hide(self):
+        self.text = None
+        self.renderer.invalidate()
+
+    def active(self):
+        return self.text is not None
+
+    def update(self):
+        if self.text is not None and pygame.time.get_ticks() >= self.expires:
+            self.hide()
+
+    def draw(self):
+        if self.text is None:
+            return
+        pygame.draw.rect(self.win, self.bg_color, self.rect)
+        self.win.blit(self.text, self.rect)
+        pygame.display.update(self.rect)
+
+    def timeout(self):
+        # How long the main loop may wait for events, 0 meaning forever.
+        if self.text is None:
+            return 0
+        return max(1, self.expires - pygame.time.get_ticks())
+
+    def linger(self):
+        # Keeps the current message up until it expires or the window is
+        # closed, for screens that are about to go away.
+        while self.text is not None:
+            self.draw()
+            for event in wait_events(self.timeout()):
+                if event.type == pygame.QUIT:
+                    return
+            self.update()